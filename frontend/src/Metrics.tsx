@@ -169,6 +169,25 @@ export function MetricsSection() {
             title="Ma'at Commit"
             cell={(report) => <code>{report.metrics.maatCommit}</code>}
           />
+          <ReportTableRow
+            title="Workflow Version"
+            cell={(report) => {
+              const differsFromPivot =
+                pivotReport != null &&
+                pivotReport.metrics.workflow !== report.metrics.workflow;
+              return (
+                <span className={differsFromPivot ? "text-warning" : undefined}>
+                  <code>{report.metrics.workflow}</code>{" "}
+                  <Q className="tooltip-left">
+                    Bumped whenever steps change in a way which makes their
+                    timings incomparable with older reports.
+                    {differsFromPivot &&
+                      " Differs from pivot report's workflow version."}
+                  </Q>
+                </span>
+              );
+            }}
+          />
           <ReportTableRow
             title="Created At"
             cell={(report) => <DateTime value={report.metrics.createdAt} />}
@@ -316,10 +316,11 @@ function IncrementalBuildTimingSection() {
                       <Q>
                         Shows projects sorted by speedup ratio (cold build time
                         / incremental build time). Higher values indicate bigger
-                        gains from incremental compilation. Cold and incremental
-                        timings are measured from the same incremental-step
-                        command. For older reports, cold timing falls back to
-                        the regular build step time.
+                        gains from incremental compilation. Cold timing is
+                        measured by the build step, which builds with tests, so
+                        it is used for builds without tests too. For older
+                        reports, cold timing falls back to the regular build
+                        step time.
                       </Q>
                     </>
                   }
@@ -402,7 +403,9 @@ function findIncrementalBuildRows(
       const incrTime = test?.[timeKey];
       const coldTime =
         timeKey === "incrementalBuildNoTestTime"
-          ? (test?.coldBuildNoTestTime ?? test?.build?.executionTime)
+          ? (test?.coldBuildNoTestTime ??
+            test?.coldBuildTime ??
+            test?.build?.executionTime)
           : (test?.coldBuildTime ?? test?.build?.executionTime);
       if (incrTime) {
         values[report.title] = incrTime;
@@ -27,8 +27,10 @@ export interface Metrics {
   scarbVersion: string;
   foundryVersion: string;
   maatCommit: string;
+  workflow: number;
   createdAt: string;
   totalExecutionTime: string;
+  totalHarnessOverhead: string;
   totalProjects: number;
   hardware: HardwareEnvironment[];
   meanBuildTime: string | null;
@@ -47,6 +49,25 @@ export interface Metrics {
   medianLsMemPostAnalysisKb: number | null;
   meanLsMemPostAnalysisPeakKb: number | null;
   medianLsMemPostAnalysisPeakKb: number | null;
+  stepResources: Record<string, StepResourceMetrics>;
+  benchmarks: Record<string, BenchmarkStats>;
+}
+
+export interface BenchmarkStats {
+  median: string;
+  mad: string;
+  ciLow: string;
+  ciHigh: string;
+  samples: number;
+}
+
+export interface StepResourceMetrics {
+  medianCpuUser: string;
+  medianCpuSystem: string;
+  medianCpuThrottled: string;
+  medianPeakMemoryKb: number | null;
+  medianIoReadBytes: number;
+  medianIoWriteBytes: number;
 }
 
 export type LabelCategory =
@@ -141,10 +162,20 @@ export function isDomainName(value: string): value is DomainName {
   return value in Domains;
 }
 
+export interface ResourceUsage {
+  cpuUser: string;
+  cpuSystem: string;
+  cpuThrottled: string;
+  peakMemoryKb: number | null;
+  ioReadBytes: number;
+  ioWriteBytes: number;
+}
+
 export interface StepReport {
   name: string;
   executionTime: string | null;
   exitCode: number | null;
+  resources: ResourceUsage | null;
 }
 
 export type TestRunner = "snforge" | "cairo-test";
@@ -167,6 +198,7 @@ export interface Test {
   incrementalBuildNoTestTime: string | null;
   lsMemPostAnalysisKb: number | null;
   lsMemPostAnalysisPeakKb: number | null;
+  benchmarks: Record<string, BenchmarkStats>;
 }
 
 export interface Report {
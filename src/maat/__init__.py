@@ -1,6 +1,7 @@
 import functools
 import shutil
 import subprocess
+from datetime import timedelta
 from pathlib import Path
 
 import click
@@ -10,12 +11,22 @@ from maat import sandbox, web
 from maat.installation import REPO
 from maat.model import Plan, PlanPartitionView, Report, ReportMeta, Semver
 from maat.report.analysis import analyse_report
+from maat.report.history import History
 from maat.report.io import ReportEditor, read_report, save_report
+from maat.report.journal import Journal
 from maat.report.metrics import Metrics
 from maat.report.reporter import Reporter
+from maat.report.result_cache import ResultCache
 from maat.runner.ephemeral_volume import ephemeral_volume
-from maat.runner.executor import docker_run_step, execute_plan, execute_plan_partition
-from maat.runner.planner import inject_local_ls_binary, prepare_plan
+from maat.runner.executor import (
+    ConcurrencyMode,
+    DockerBackend,
+    docker_run_step,
+    execute_plan,
+    execute_plan_partition,
+)
+from maat.runner.planner import Benchmark, inject_local_ls_binary, prepare_plan
+from maat.runner.work_queue import open_work_queue
 from maat.utils.asdf import asdf_latest, asdf_set
 from maat.utils.log import log, track
 from maat.utils.shell import join_command
@@ -72,6 +83,34 @@ def sandbox_options(f=None, /, pull: bool = True):
     return decorator(f)
 
 
+def benchmark_options(f):
+    @click.pass_context
+    def new_func(ctx, *args, benchmark_runs: int, benchmark_warmup: int, **kwargs):
+        kwargs["benchmark"] = (
+            Benchmark(warmup=benchmark_warmup, runs=benchmark_runs)
+            if benchmark_runs > 0
+            else None
+        )
+        return ctx.invoke(f, *args, **kwargs)
+
+    new_func = functools.update_wrapper(new_func, f)
+    new_func = click.option(
+        "--benchmark-warmup",
+        metavar="N",
+        type=click.IntRange(min=0),
+        default=1,
+        help="Number of unmeasured warmup runs of benchmarked steps.",
+    )(new_func)
+    new_func = click.option(
+        "--benchmark-runs",
+        metavar="N",
+        type=click.IntRange(min=0),
+        default=0,
+        help="Run build, incremental build, lint and test steps N times each and report statistics of all samples; 0 disables benchmarking.",
+    )(new_func)
+    return new_func
+
+
 def load_workspace(f=None, /, optional: bool = False):
     def decorator(f):
         @click.pass_context
@@ -198,10 +237,47 @@ def cli() -> None:
     "-j",
     "--jobs",
     metavar="N",
-    help="Allow N jobs at once; defaults to number of CPUs.",
+    help="Allow at most N jobs at once; defaults to number of CPUs. Fewer run when predicted peak memory does not fit (--concurrency memory) or when the host is under pressure (--concurrency pressure).",
     type=int,
     default=None,
 )
+@click.option(
+    "--exec-steps",
+    is_flag=True,
+    help="Run non-setup steps of each test with docker exec in one long-lived container, resetting its state between steps, instead of starting a container per step.",
+)
+@click.option(
+    "--concurrency",
+    type=click.Choice(["memory", "pressure"]),
+    default="memory",
+    help="How the number of concurrently running tests is controlled: 'memory' starts tests when their predicted peak memory fits, 'pressure' adapts to Linux PSI readings.",
+)
+@click.option(
+    "--docker-backend",
+    type=click.Choice(["cli", "engine"]),
+    default="cli",
+    help="How Docker is driven: 'cli' spawns the docker CLI for every operation, 'engine' talks to the Docker Engine API over its unix socket directly.",
+)
+@click.option(
+    "--isolate",
+    is_flag=True,
+    help="Give every job dedicated CPUs and an equal share of memory, and limit tools' thread counts to match, so that timings of a test do not depend on tests running alongside.",
+)
+@click.option(
+    "--exclusive-timings",
+    is_flag=True,
+    help="After all tests finish, re-run their build, lint and test steps one project at a time in already baked images, and use these timings in metrics.",
+)
+@click.option(
+    "--parallel-steps",
+    is_flag=True,
+    help="Run independent steps of a test in parallel, within the --jobs limit of running containers, instead of one after another. Timings of steps running alongside affect each other.",
+)
+@click.option(
+    "--no-cache",
+    is_flag=True,
+    help="Execute all tests, instead of reusing cached results of tests with the same revision, toolchain and sandbox image.",
+)
 @click.option(
     "--report-name",
     type=str,
@@ -214,6 +290,12 @@ def cli() -> None:
     default=None,
     help="Extra environment variables passed to all steps, e.g. 'SCARB_INCREMENTAL=0 CAIRO_LS_LOG=debug'.",
 )
+@click.option(
+    "--reuse-artifacts",
+    is_flag=True,
+    help="Start lint, test and ls steps from a snapshot of the build step's container, reusing its compilation artifacts, instead of from scratch.",
+)
+@benchmark_options
 @load_workspace
 @tool_versions(optional_if_pull=True)
 @load_sandbox_image
@@ -223,11 +305,22 @@ def run_local(
     workspace: Workspace,
     sandbox_image: Image,
     jobs: int | None,
+    concurrency: ConcurrencyMode,
+    exec_steps: bool,
+    docker_backend: DockerBackend,
+    isolate: bool,
+    exclusive_timings: bool,
+    parallel_steps: bool,
+    no_cache: bool,
     report_name: str | None,
     extra_env: str | None,
+    reuse_artifacts: bool,
+    benchmark: Benchmark | None,
 ) -> None:
     log(f"🧪 Running experiment within workspace: {workspace}")
 
+    history = History.load()
+
     plan = prepare_plan(
         workspace=workspace,
         sandbox=sandbox_image,
@@ -235,15 +328,37 @@ def run_local(
         docker=docker,
         report_name=report_name,
         extra_env=extra_env,
+        history=history,
+        benchmark=benchmark,
+        reuse_artifacts=reuse_artifacts,
     )
 
-    reporter = Reporter(plan)
+    cache = None
+    if not no_cache:
+        cache = ResultCache(
+            plan,
+            # These change what gets recorded, so results of other modes do not apply.
+            modes={
+                "exec_steps": exec_steps,
+                "isolate": isolate,
+                "exclusive_timings": exclusive_timings,
+                "parallel_steps": parallel_steps,
+            },
+        )
+    reporter = Reporter(plan, cache=cache)
 
     execute_plan(
         plan=plan,
         jobs=jobs,
         docker=docker,
         reporter=reporter,
+        history=history,
+        concurrency=concurrency,
+        exec_steps=exec_steps,
+        docker_backend=docker_backend,
+        isolate=isolate,
+        exclusive_timings=exclusive_timings,
+        parallel_steps=parallel_steps,
     )
 
     report = reporter.finish()
@@ -519,6 +634,12 @@ def gc_reports() -> None:
     default=None,
     help="Extra environment variables passed to all steps, e.g. 'SCARB_INCREMENTAL=0 CAIRO_LS_LOG=debug'.",
 )
+@click.option(
+    "--reuse-artifacts",
+    is_flag=True,
+    help="Start lint, test and ls steps from a snapshot of the build step's container, reusing its compilation artifacts, instead of from scratch.",
+)
+@benchmark_options
 @load_workspace
 @tool_versions
 @load_sandbox_image
@@ -531,7 +652,11 @@ def plan(
     partitions: int,
     report_name: str | None,
     extra_env: str | None,
+    reuse_artifacts: bool,
+    benchmark: Benchmark | None,
 ) -> None:
+    history = History.load()
+
     plan = prepare_plan(
         workspace=workspace,
         sandbox=sandbox_image,
@@ -539,8 +664,18 @@ def plan(
         docker=docker,
         report_name=report_name,
         extra_env=extra_env,
+        history=history,
+        benchmark=benchmark,
+        reuse_artifacts=reuse_artifacts,
     )
 
+    for idx, test_suite in enumerate(plan.partitions):
+        predicted = sum(map(history.predict_duration, test_suite.tests), timedelta())
+        log(
+            f"⏱️ Partition {idx}: {len(test_suite.tests)} tests, "
+            f"predicted total test time: {timedelta(seconds=round(predicted.total_seconds()))}"
+        )
+
     json_data = plan.model_dump_json(indent=2) + "\n"
 
     with click.open_file(output, "w") as f:
@@ -559,23 +694,80 @@ def plan(
     "-j",
     "--jobs",
     metavar="N",
-    help="Allow N jobs at once; defaults to number of CPUs.",
+    help="Allow at most N jobs at once; defaults to number of CPUs. Fewer run when predicted peak memory does not fit (--concurrency memory) or when the host is under pressure (--concurrency pressure).",
     type=int,
     default=None,
 )
+@click.option(
+    "--exec-steps",
+    is_flag=True,
+    help="Run non-setup steps of each test with docker exec in one long-lived container, resetting its state between steps, instead of starting a container per step.",
+)
+@click.option(
+    "--concurrency",
+    type=click.Choice(["memory", "pressure"]),
+    default="memory",
+    help="How the number of concurrently running tests is controlled: 'memory' starts tests when their predicted peak memory fits, 'pressure' adapts to Linux PSI readings.",
+)
+@click.option(
+    "--docker-backend",
+    type=click.Choice(["cli", "engine"]),
+    default="cli",
+    help="How Docker is driven: 'cli' spawns the docker CLI for every operation, 'engine' talks to the Docker Engine API over its unix socket directly.",
+)
+@click.option(
+    "--isolate",
+    is_flag=True,
+    help="Give every job dedicated CPUs and an equal share of memory, and limit tools' thread counts to match, so that timings of a test do not depend on tests running alongside.",
+)
+@click.option(
+    "--exclusive-timings",
+    is_flag=True,
+    help="After all tests finish, re-run their build, lint and test steps one project at a time in already baked images, and use these timings in metrics.",
+)
+@click.option(
+    "--parallel-steps",
+    is_flag=True,
+    help="Run independent steps of a test in parallel, within the --jobs limit of running containers, instead of one after another. Timings of steps running alongside affect each other.",
+)
+@click.option(
+    "--no-cache",
+    is_flag=True,
+    help="Execute all tests, instead of reusing cached results of tests with the same revision, toolchain and sandbox image.",
+)
 @click.option(
     "--local-ls-binary",
     type=str,
     default=None,
     help="Host path to a locally compiled cairo-language-server binary to use instead of the one bundled with scarb.",
 )
+@click.option(
+    "--resume",
+    is_flag=True,
+    help="Resume an interrupted run of this partition: skip tests already finished according to its journal.",
+)
+@click.option(
+    "--queue",
+    metavar="BACKEND:LOCATION",
+    default=None,
+    help="Pull tests from a work queue shared by runners of all partitions, so that runners which are done with their own partition take over tests of others. Supported backends: 'sqlite:PATH'.",
+)
 @pass_docker
 def run_plan(
     docker: DockerClient,
     plan_file: Path,
     partition: int | None,
     jobs: int | None,
+    concurrency: ConcurrencyMode,
+    exec_steps: bool,
+    docker_backend: DockerBackend,
+    isolate: bool,
+    exclusive_timings: bool,
+    parallel_steps: bool,
+    no_cache: bool,
     local_ls_binary: str | None,
+    resume: bool,
+    queue: str | None,
 ) -> None:
     print(f"🧪 Running plan from file: {plan_file}")
 
@@ -600,15 +792,73 @@ def run_plan(
             f"Partition index out of range. Plan has {len(plan.partitions)} partitions (0-{len(plan.partitions) - 1})."
         )
 
-    partition_view = PlanPartitionView(plan=plan, partition=partition)
+    history = History.load()
 
-    reporter = Reporter(plan)
+    work_queue = None
+    if queue is not None:
+        try:
+            work_queue = open_work_queue(queue, plan, history)
+        except ValueError as e:
+            raise click.BadParameter(str(e), param_hint="--queue")
+        # Tests claimed by a previous runner of this partition will never be finished by it.
+        work_queue.release_claimed(partition)
+
+    # Finished tests are journaled as soon as they complete, so that an interrupted run can be
+    # resumed with `--resume`.
+    journal = Journal(plan.journal_path(partition=partition))
+    cache = None
+    if not no_cache:
+        cache = ResultCache(
+            plan,
+            # These change what gets recorded, so results of other modes do not apply.
+            modes={
+                "exec_steps": exec_steps,
+                "isolate": isolate,
+                "exclusive_timings": exclusive_timings,
+                "parallel_steps": parallel_steps,
+            },
+        )
+    reporter = Reporter(plan, journal=journal, cache=cache)
+
+    if resume:
+        test_suite = plan.partitions[partition]
+        # With a work queue, this runner might have run tests of any partition.
+        planned = {
+            test.name
+            for suite in (plan.partitions if work_queue else [test_suite])
+            for test in suite.tests
+        }
+        finished = [test for test in journal.recover() if test.name in planned]
+        reporter.restore(finished)
+
+        finished_names = {test.name for test in finished}
+        if work_queue is not None:
+            work_queue.mark_done(list(finished_names))
+        test_suite.tests = [
+            test for test in test_suite.tests if test.name not in finished_names
+        ]
+        log(
+            f"⏩ Resuming: {len(finished)} tests already finished, "
+            f"{len(test_suite.tests)} remaining"
+        )
+    else:
+        journal.clear()
+
+    partition_view = PlanPartitionView(plan=plan, partition=partition)
 
     execute_plan_partition(
         partition=partition_view,
         jobs=jobs,
         docker=docker,
         reporter=reporter,
+        history=history,
+        concurrency=concurrency,
+        exec_steps=exec_steps,
+        docker_backend=docker_backend,
+        isolate=isolate,
+        exclusive_timings=exclusive_timings,
+        parallel_steps=parallel_steps,
+        queue=work_queue,
     )
 
     report = reporter.finish()
@@ -619,6 +869,9 @@ def run_plan(
 
     save_report(report, plan.report_path(partition=partition))
 
+    # The report is complete now, so the journal is no longer needed.
+    journal.clear()
+
 
 @cli.command(help="Merge multiple reports into a single report.")
 @click.option(
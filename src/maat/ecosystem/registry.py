@@ -1,11 +1,16 @@
+import functools
+import hashlib
+from pathlib import Path
 from typing import Self
 from urllib.parse import urljoin
 
-import requests
-from pydantic import BaseModel, RootModel
+from pydantic import BaseModel, RootModel, ValidationError
 
 from maat.ecosystem import scarbs_xyz
 from maat.model import Step
+from maat.utils import http
+from maat.utils.cache import cache_root, write_atomically
+from maat.utils.log import log
 from maat.utils.smart_sort import smart_sort_key
 from maat.utils.unique_id import snowflake_id
 
@@ -41,8 +46,8 @@ class RegistryConfig(BaseModel):
 
     @classmethod
     def fetch(cls, registry_url: str) -> Self:
-        url = cls.config_json_url(registry_url)
-        return cls.model_validate_json(requests.get(url).content)
+        """Fetch the registry configuration, once per process."""
+        return _fetch_config(registry_url)
 
     @classmethod
     def config_json_url(cls, registry_url: str) -> str:
@@ -70,14 +75,101 @@ class IndexRecords(RootModel):
 
     @classmethod
     def fetch(cls, registry: RegistryConfig, package: str) -> Self:
-        url = registry.expand_index(package)
-        return cls.model_validate_json(requests.get(url).content)
+        """Fetch index records of the package, once per process, see ``IndexCache``."""
+        return _fetch_index(registry.expand_index(package))
 
     def latest_version(self) -> str:
         latest_record = max(self.root, key=lambda record: smart_sort_key(record.v))
         return latest_record.v
 
 
+INDEX_CACHE_VERSION = 1
+"""Bump to invalidate all cached index files, e.g. when the entry format changes."""
+
+
+class _IndexCacheEntry(BaseModel):
+    version: int = INDEX_CACHE_VERSION
+    url: str
+    etag: str | None = None
+    last_modified: str | None = None
+    content: str
+
+
+class IndexCache:
+    """
+    On-disk cache of registry index files, shared across runs on this machine.
+
+    Cached files are always revalidated with a conditional request (``If-None-Match`` and
+    ``If-Modified-Since``), so a package which has been released since is never missed, while
+    unchanged index files are not downloaded again. Responses without an ``ETag`` or
+    ``Last-Modified`` header cannot be revalidated, so they are not stored.
+
+    The cache lives in ``$MAAT_REGISTRY_CACHE``, or ``$XDG_CACHE_HOME/maat/registry`` by default.
+    """
+
+    def __init__(self, root: Path | None = None):
+        self._root = root or cache_root("MAAT_REGISTRY_CACHE", "registry")
+
+    def get(self, url: str) -> bytes:
+        path = self._path(url)
+        entry = self._load(path, url)
+
+        headers = {}
+        if entry is not None:
+            if entry.etag:
+                headers["If-None-Match"] = entry.etag
+            if entry.last_modified:
+                headers["If-Modified-Since"] = entry.last_modified
+
+        response = http.get(url, headers=headers)
+        if response.status_code == 304 and entry is not None:
+            return entry.content.encode("utf-8")
+
+        etag = response.headers.get("ETag")
+        last_modified = response.headers.get("Last-Modified")
+        if etag or last_modified:
+            write_atomically(
+                path,
+                _IndexCacheEntry(
+                    url=url,
+                    etag=etag,
+                    last_modified=last_modified,
+                    content=response.text,
+                ).model_dump_json(),
+            )
+
+        return response.content
+
+    def _load(self, path: Path, url: str) -> _IndexCacheEntry | None:
+        try:
+            entry = _IndexCacheEntry.model_validate_json(path.read_bytes())
+        except FileNotFoundError:
+            return None
+        except (OSError, ValidationError) as e:
+            log(f"⚠️ Ignoring unreadable cached registry index {url}: {e}")
+            path.unlink(missing_ok=True)
+            return None
+
+        if entry.version != INDEX_CACHE_VERSION or entry.url != url:
+            return None
+        return entry
+
+    def _path(self, url: str) -> Path:
+        key = hashlib.sha256(url.encode("utf-8")).hexdigest()
+        return self._root / key[:2] / f"{key}.json"
+
+
+@functools.cache
+def _fetch_config(registry_url: str) -> RegistryConfig:
+    url = RegistryConfig.config_json_url(registry_url)
+    return RegistryConfig.model_validate_json(http.get(url).content)
+
+
+@functools.cache
+def _fetch_index(url: str) -> IndexRecords:
+    return IndexRecords.model_validate_json(IndexCache().get(url))
+
+
 def _package_prefix(name: str) -> str:
     """Make a path to a package directory, which aligns to the index directory layout."""
     match len(name):
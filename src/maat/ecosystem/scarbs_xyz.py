@@ -1,15 +1,48 @@
+import functools
+import json
 import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from pathlib import Path
 from urllib.parse import urljoin
 
-import requests
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, SoupStrainer
+
+from maat.utils import http
+from maat.utils.cache import cache_root, write_atomically
+from maat.utils.http import HTTP_POOL_SIZE
+from maat.utils.log import log
 
 BASE_URL = "https://scarbs.xyz/"
 
+PACKAGE_LIST_TTL = timedelta(days=1)
+"""
+How long the cached list of all packages is used before scraping it again. Only the list is
+cached: versions of listed packages are always resolved against the registry index.
+"""
+
 
+@functools.cache
 def fetch_all_packages() -> list[str]:
-    response = requests.get(urljoin(BASE_URL, "/packages"))
-    soup = BeautifulSoup(response.text, "html.parser")
+    """
+    List names of all packages published on scarbs.xyz, once per process.
+
+    The registry index has no listing of packages, so they are scraped from the website, with all
+    pages fetched concurrently. The result is cached on disk for ``PACKAGE_LIST_TTL``, next to
+    the registry index cache (``$MAAT_REGISTRY_CACHE``, or ``$XDG_CACHE_HOME/maat/registry``).
+    """
+    path = cache_root("MAAT_REGISTRY_CACHE", "registry") / "scarbs-xyz-packages.json"
+    if (packages := _load_cached(path)) is not None:
+        return packages
+
+    packages = _scrape_all_packages()
+    write_atomically(path, json.dumps({"packages": packages}))
+    return packages
+
+
+def _scrape_all_packages() -> list[str]:
+    soup = _parse(http.get(urljoin(BASE_URL, "/packages")).text)
 
     total_pages = 1
     for link in soup.select("a[href*='?page=']"):
@@ -19,20 +52,49 @@ def fetch_all_packages() -> list[str]:
             page_number = int(match.group(1))
             total_pages = max(total_pages, page_number)
 
+    page_urls = [
+        urljoin(BASE_URL, f"/packages?page={page}")
+        for page in range(1, total_pages + 1)
+    ]
+    with ThreadPoolExecutor(max_workers=HTTP_POOL_SIZE) as pool:
+        pages = pool.map(_get_packages_from_page, page_urls)
+
     result = set()
-    for page in range(1, total_pages + 1):
-        page_url = urljoin(BASE_URL, f"/packages?page={page}")
-        result.update(_get_packages_from_page(page_url))
+    for page in pages:
+        result.update(page)
 
     return list(sorted(result))
 
 
-def _get_packages_from_page(page_url):
-    response = requests.get(page_url)
-    soup = BeautifulSoup(response.text, "html.parser")
+def _get_packages_from_page(page_url: str) -> list[str]:
+    soup = _parse(http.get(page_url).text)
 
+    packages = []
     for link in soup.select("a[href*='/packages/']"):
         href = link.get("href")
         match = re.match(r".*/packages/([^/]+)(?:$|/.*)", href)
         if match:
-            yield match.group(1)
+            packages.append(match.group(1))
+    return packages
+
+
+def _parse(html: str) -> BeautifulSoup:
+    # Only links matter, so skip building the rest of the tree.
+    return BeautifulSoup(html, "html.parser", parse_only=SoupStrainer("a"))
+
+
+def _load_cached(path: Path) -> list[str] | None:
+    try:
+        age = time.time() - path.stat().st_mtime
+    except FileNotFoundError:
+        return None
+
+    if age > PACKAGE_LIST_TTL.total_seconds():
+        return None
+
+    try:
+        return json.loads(path.read_text(encoding="utf-8"))["packages"]
+    except (OSError, ValueError, KeyError) as e:
+        log(f"⚠️ Ignoring unreadable cached scarbs.xyz package list: {e}")
+        path.unlink(missing_ok=True)
+        return None
@@ -1,11 +1,24 @@
 import os
 import platform
 import re
-from typing import Self
+from typing import Literal, Self
 
 from pydantic import BaseModel
 
 
+class WorkerIsolation(BaseModel):
+    """Resources dedicated to one executor worker, see ``--isolate``."""
+
+    cpus: list[int]
+    """Host CPUs the worker's containers are pinned to."""
+    memory_mb: int | None
+    """Memory limit of the worker's containers, if host memory could be inspected."""
+
+    @property
+    def cpuset(self) -> str:
+        return ",".join(map(str, self.cpus))
+
+
 class HardwareEnvironment(BaseModel):
     os: str
     arch: str
@@ -13,6 +26,8 @@ class HardwareEnvironment(BaseModel):
     cpu_count: int | None
     memory_total_mb: int | None
     ci: bool
+    workers: list[WorkerIsolation] | None = None
+    """Per-worker resource assignment, if tests were executed in isolation mode."""
 
     @classmethod
     def capture(cls) -> Self:
@@ -78,3 +93,39 @@ def _memory_total_mb() -> int | None:
     except Exception:
         pass
     return None
+
+
+def memory_available_kb() -> int | None:
+    """Memory available for starting new applications without swapping, read live on each call."""
+    if platform.system() != "Linux":
+        return None
+    try:
+        with open("/proc/meminfo") as f:
+            for line in f:
+                if line.startswith("MemAvailable:"):
+                    match = re.search(r"(\d+)", line)
+                    if match is None:
+                        return None
+                    return int(match.group(1))
+    except OSError:
+        return None
+    return None
+
+
+def pressure_avg10(resource: Literal["cpu", "memory", "io"]) -> float | None:
+    """
+    Share of time (in percent) over the last 10 seconds in which some tasks were stalled on the
+    given resource, according to Linux PSI (Pressure Stall Information).
+    """
+    try:
+        with open(f"/proc/pressure/{resource}") as f:
+            for line in f:
+                if line.startswith("some "):
+                    match = re.search(r"avg10=(\d+(?:\.\d+)?)", line)
+                    if match is None:
+                        return None
+                    return float(match.group(1))
+    except OSError:
+        # PSI is unavailable on non-Linux hosts and on kernels without CONFIG_PSI.
+        return None
+    return None
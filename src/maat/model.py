@@ -1,6 +1,7 @@
 import enum
 import random
 from collections.abc import MutableSet
+from contextlib import contextmanager
 from datetime import datetime, timedelta, timezone
 from pathlib import Path
 from typing import Any, Callable, Iterator, Literal, Self, Protocol
@@ -8,14 +9,16 @@ from typing import Any, Callable, Iterator, Literal, Self, Protocol
 from pydantic import (
     BaseModel,
     Field,
+    PrivateAttr,
     RootModel,
     SerializerFunctionWrapHandler,
     model_serializer,
     model_validator,
 )
 
-from maat.hardware import HardwareEnvironment
+from maat.hardware import HardwareEnvironment, WorkerIsolation
 from maat.installation import REPO, this_maat_commit
+from maat.report.log_sink import LogSpillRef
 from maat.utils.shell import join_command, inline_env, add_workdir
 from maat.utils.smart_sort import smart_sort_key
 
@@ -60,6 +63,19 @@ class Step(BaseModel):
     disables the timeout. Set for steps that can hang indefinitely (notably the ``ls`` step, which
     drives CairoLS and can freeze on heavy proc-macro projects).
     """
+    needs: list[str] | None = None
+    """
+    Names of preceding steps which must finish before this one starts, when non-setup steps of
+    a test run in parallel (``--parallel-steps``). ``None`` (the default) means all preceding
+    steps. This only orders execution: a step runs even if steps it needs have failed.
+    """
+    artifacts_from: str | None = None
+    """
+    Name of a preceding step whose container, as left when that step succeeded, this step starts
+    from instead of the baked test image, e.g., to reuse a warm ``target`` directory. If that step
+    failed, this step starts from the baked test image. When steps run with docker exec, the
+    named step's state is saved and restored inside the test container instead.
+    """
     binds: list[list[str]] = Field(default_factory=list, exclude=True)
     """
     Host bind mounts for this step: each entry is [host_path, container_path, mode].
@@ -106,18 +122,38 @@ class TestSuite(BaseModel):
                 return test
         return None
 
-    def partition(self, n: int) -> list[Self]:
+    def partition(
+        self, n: int, cost: Callable[[Test], timedelta] | None = None
+    ) -> list[Self]:
+        """
+        Split tests into ``n`` partitions.
+
+        If ``cost`` is provided, tests are packed with the LPT (longest processing time first)
+        heuristic: each test, from the most to the least costly one, goes to the partition with
+        the lowest total cost so far. This keeps the slowest partition as short as possible.
+        Otherwise, heavy and light tests are shuffled and dealt round-robin.
+        """
         assert n > 0
 
         if n == 1:
             return [self]
 
+        buckets: list[list[Test]] = [[] for _ in range(n)]
+
+        if cost is not None:
+            costs = {test.name: cost(test) for test in self.tests}
+            loads = [timedelta()] * n
+            for test in sorted(self.tests, key=lambda t: costs[t.name], reverse=True):
+                idx = min(range(n), key=lambda i: loads[i])
+                buckets[idx].append(test)
+                loads[idx] += costs[test.name]
+            return [self.__class__(tests=bucket) for bucket in buckets]
+
         heavy = [t for t in self.tests if t.heavy]
         light = [t for t in self.tests if not t.heavy]
         random.shuffle(heavy)
         random.shuffle(light)
 
-        buckets: list[list[Test]] = [[] for _ in range(n)]
         for idx, test in enumerate(heavy):
             buckets[idx % n].append(test)
         for idx, test in enumerate(light):
@@ -244,31 +280,125 @@ class Analyses(BaseModel):
     tests_summary: TestsSummary | None = None
     test_runner: Literal["snforge", "cairo-test"] | None = None
     cold_build_time: timedelta | None = None
-    """Time of cold ``scarb build --workspace --test`` measured inside incremental-build step."""
+    """
+    Time of cold ``scarb build --workspace --test``, measured by the build step. Older reports
+    have it measured inside the incremental-build step.
+    """
     cold_build_no_test_time: timedelta | None = None
-    """Time of cold ``scarb build --workspace`` measured inside incremental-build-no-test step."""
+    """
+    Time of cold ``scarb build --workspace``. Only older reports have it, measured inside the
+    incremental-build-no-test step, which now starts from the result of the build step.
+    """
     incremental_build_time: timedelta | None = None
     """Time of ``scarb build --workspace --test`` with a warm target directory."""
     incremental_build_no_test_time: timedelta | None = None
     """Time of ``scarb build --workspace`` with a warm target directory."""
+    touch_leaf_build_time: timedelta | None = None
+    """
+    Time of ``scarb build --workspace --test`` with a warm target directory, after touching a
+    module without submodules. This and the following timings are measured one after another
+    by the ``edit-build`` step, each edit adding to the previous ones.
+    """
+    add_fn_build_time: timedelta | None = None
+    """Rebuild time after adding a function to the root ``lib.cairo``."""
+    edit_fn_build_time: timedelta | None = None
+    """Rebuild time after changing the body of the function added before."""
+    add_test_build_time: timedelta | None = None
+    """Rebuild time after adding a test module to the root ``lib.cairo``."""
     ls_mem_post_analysis_kb: int | None = None
     """CairoLS RSS (KB) captured at the last AnalysisFinished event of the initial analysis."""
     ls_mem_post_analysis_peak_kb: int | None = None
     """CairoLS peak RSS (VmHWM, KB) reached during initial analysis."""
+    exclusive_build_time: timedelta | None = None
+    """Time of the ``build`` step re-run alone on an idle machine, see ``--exclusive-timings``."""
+    exclusive_lint_time: timedelta | None = None
+    exclusive_test_time: timedelta | None = None
+    exclusive_cold_build_time: timedelta | None = None
+    exclusive_incremental_build_time: timedelta | None = None
+    exclusive_cold_build_no_test_time: timedelta | None = None
+    exclusive_incremental_build_no_test_time: timedelta | None = None
+    exclusive_touch_leaf_build_time: timedelta | None = None
+    exclusive_add_fn_build_time: timedelta | None = None
+    exclusive_edit_fn_build_time: timedelta | None = None
+    exclusive_add_test_build_time: timedelta | None = None
+    benchmarks: dict[str, list[timedelta]] | None = None
+    """
+    Measured samples of benchmarked steps (see ``--benchmark-runs``), keyed by the name of the
+    timing, e.g. ``build_time`` or ``incremental_build_time``. Warmup runs are not included.
+    """
 
     @model_serializer(mode="wrap")
     def serialize_model(self, nxt: SerializerFunctionWrapHandler):
         return {k: v for k, v in nxt(self).items() if v is not None}
 
 
+class ResourceUsage(BaseModel):
+    """Resources used by a step's container, sampled from its cgroup while it was running."""
+
+    cpu_user: timedelta
+    cpu_system: timedelta
+    cpu_throttled: timedelta
+    """Time the container was throttled for exceeding its CPU quota."""
+    peak_memory_kb: int | None
+    io_read_bytes: int
+    io_write_bytes: int
+
+    @property
+    def cpu_time(self) -> timedelta:
+        return self.cpu_user + self.cpu_system
+
+
+class StepOverhead(BaseModel):
+    """
+    Breakdown of a step's wall-clock time into phases of its container's lifecycle.
+
+    Phases the container never reached (e.g., because it failed to start) are ``None``.
+    """
+
+    create: timedelta | None
+    """From requesting the container until it was created."""
+    start: timedelta | None
+    """From creating the container until its process started."""
+    first_output: timedelta | None
+    """From the process start until its first output line was received."""
+    run: timedelta | None
+    """From the process start until it exited; this is the time of the tool itself."""
+    teardown: timedelta | None
+    """
+    From the process exit until the container was removed. The container is removed after the
+    step's timer has stopped, so this is not part of the step's execution time. Not reported for
+    snapshotted containers, which are removed only after the snapshot.
+    """
+    snapshot: timedelta | None = None
+    """
+    Time spent snapshotting the container after the step had finished, so that steps reusing its
+    artifacts can start from it (see ``Step.artifacts_from``). This is not part of the step's
+    execution time.
+    """
+
+
 class StepReport(BaseModel):
     name: str
     run: str
     exit_code: int | None
     execution_time: timedelta | None
 
+    log_size: int | None = None
+    """Size of the full step log in bytes, which may be bigger than ``log`` if it was truncated."""
+    log_lines: int | None = None
+    """Number of lines of the full step log."""
+    resources: ResourceUsage | None = None
+    overhead: StepOverhead | None = None
+    log_spill: LogSpillRef | None = None
+    """Where the part omitted from ``log`` is stored; never saved in reports, see ``LogSpillRef``."""
+
     # This one is kept last because it takes significant chunks of view area.
     log: bytes | None = None
+    """Step log; only its head and tail are stored if it was too big."""
+
+    _keep_restored_log: bool = PrivateAttr(default=False)
+    _restored_log: tuple[bytes, str] | None = PrivateAttr(default=None)
+    """Full log and its text, kept only within ``TestReport.restored_logs``."""
 
     @classmethod
     def blueprint(cls, step: Step):
@@ -280,22 +410,73 @@ class StepReport(BaseModel):
             log=None,
         )
 
+    @property
+    def full_log(self) -> bytes | None:
+        """
+        Full step log, including the part omitted from ``log``, if any.
+
+        The omitted part is not saved in reports, so logs of loaded reports stay truncated. It is
+        read from disk on every call, unless within ``TestReport.restored_logs``.
+        """
+        if (restored := self._restore_log()) is not None:
+            return restored[0]
+        return self.log
+
     @property
     def log_str(self) -> str | None:
+        if (restored := self._restore_log()) is not None:
+            return restored[1]
         if self.log is None:
             return None
         return self.log.decode("utf-8", errors="replace")
 
+    def _restore_log(self) -> tuple[bytes, str] | None:
+        if self.log is None or self.log_spill is None:
+            return None
+        if self._restored_log is not None:
+            return self._restored_log
+        full_log = self.log_spill.restore(self.log) or self.log
+        restored = (full_log, full_log.decode("utf-8", errors="replace"))
+        if self._keep_restored_log:
+            self._restored_log = restored
+        return restored
+
     @property
     def was_executed(self) -> bool:
         return self.exit_code is not None and self.exit_code != EXIT_RUNNER_SKIPPED
 
 
+class HarnessOverhead(BaseModel):
+    """Time a test spent in harness operations outside its steps."""
+
+    bake: timedelta | None = None
+    """Baking cache and workbench volumes into the test image."""
+    volume_create: timedelta = timedelta()
+    """Creating cache and workbench volumes."""
+    volume_remove: timedelta = timedelta()
+    """Removing cache and workbench volumes, including retries."""
+    volume_remove_attempts: int = 0
+
+    @property
+    def total(self) -> timedelta:
+        return (self.bake or timedelta()) + self.volume_create + self.volume_remove
+
+
 class TestReport(BaseModel):
     name: str
     rev: str | None = None
     steps: list[StepReport] = []
     analyses: Analyses = Analyses()
+    overhead: HarnessOverhead = HarnessOverhead()
+    cached: bool = False
+    """Whether this result was reused from the result cache instead of being executed."""
+    worker: WorkerIsolation | None = None
+    """Resources the test was executed with, if it was executed in isolation mode."""
+    exclusive_steps: list[StepReport] = []
+    """
+    Timing-relevant steps re-run one project at a time after all tests have finished, if the
+    experiment was run with ``--exclusive-timings``.
+    """
 
     @property
     def name_and_rev(self) -> str:
@@ -315,6 +496,22 @@ class TestReport(BaseModel):
                 return step
         return None
 
+    @contextmanager
+    def restored_logs(self) -> Iterator[None]:
+        """
+        Restore full logs of steps at most once within this block, and drop them when it ends, so
+        that only logs of tests being analysed are held in memory.
+        """
+        steps = [*self.steps, *self.exclusive_steps]
+        for step in steps:
+            step._keep_restored_log = True
+        try:
+            yield
+        finally:
+            for step in steps:
+                step._keep_restored_log = False
+                step._restored_log = None
+
     def combined_log(self) -> bytes:
         chunks = []
         chunks.extend(("=== ", self.name_and_rev, " ===\n"))
@@ -330,6 +527,27 @@ class TestReport(BaseModel):
         )
 
 
+class ConcurrencyDecision(BaseModel):
+    """A change of the number of concurrently running tests made by the pressure controller."""
+
+    at: timedelta
+    """Time since the start of executing the partition."""
+    limit: int
+    """The new maximum number of concurrently running tests."""
+    running: int
+    """Number of tests running when the decision was made."""
+    cpu_pressure: float | None
+    memory_pressure: float | None
+    io_pressure: float | None
+
+
+class SkippedProject(BaseModel):
+    """An ecosystem project left out of the plan, because its revision could not be resolved."""
+
+    name: str
+    reason: str
+
+
 class Report(BaseModel):
     workspace: str
     scarb: Semver
@@ -337,8 +555,15 @@ class Report(BaseModel):
     maat_commit: str = Field(default_factory=this_maat_commit)
     created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
     total_execution_time: timedelta
+    workflow: int = 1
+    """
+    Version of the step workflow the report was produced with, see ``WORKFLOW_VERSION``.
+    Timings of reports with different versions are not comparable.
+    """
     tests: list[TestReport] = []
     hardware: list[HardwareEnvironment] = []
+    concurrency: list[ConcurrencyDecision] = []
+    skipped: list[SkippedProject] = []
 
     @property
     def by_version_preferring_scarb(self):
@@ -357,7 +582,7 @@ class Report(BaseModel):
     def merge(cls, reports: list[Self]) -> Self:
         assert len(reports) > 0
 
-        for field in ["workspace", "scarb", "foundry", "maat_commit"]:
+        for field in ["workspace", "scarb", "foundry", "maat_commit", "workflow"]:
             if not all(
                 getattr(r, field) == getattr(reports[0], field) for r in reports
             ):
@@ -369,17 +594,27 @@ class Report(BaseModel):
                 if h not in merged_hardware:
                     merged_hardware.append(h)
 
+        # Every partition of a plan reports the same skipped projects.
+        merged_skipped: list[SkippedProject] = []
+        for r in reports:
+            for p in r.skipped:
+                if p not in merged_skipped:
+                    merged_skipped.append(p)
+
         return Report(
             workspace=reports[0].workspace,
             scarb=reports[0].scarb,
             foundry=reports[0].foundry,
             maat_commit=reports[0].maat_commit,
+            workflow=reports[0].workflow,
             created_at=max(r.created_at for r in reports),
             total_execution_time=sum(
                 (r.total_execution_time for r in reports), timedelta()
             ),
             tests=[t for r in reports for t in r.tests],
             hardware=merged_hardware,
+            concurrency=[d for r in reports for d in r.concurrency],
+            skipped=merged_skipped,
         )
 
     def before_save(self):
@@ -411,7 +646,13 @@ class ReportMeta(BaseModel):
 
 
 class Plan(BaseModel):
+    id: str | None = None
+    """
+    Unique identifier of the generated plan, see ``SqliteWorkQueue``. Missing in older plans.
+    """
     workspace: str
+    workflow: int = 1
+    """Version of the step workflow, see ``WORKFLOW_VERSION``."""
     scarb: Semver
     foundry: Semver
 
@@ -419,6 +660,7 @@ class Plan(BaseModel):
     sandbox: str
 
     partitions: list[TestSuite]
+    skipped: list[SkippedProject] = []
 
     def partition_views(self) -> list["PlanPartitionView"]:
         return [
@@ -442,6 +684,13 @@ class Plan(BaseModel):
 
         return base / file_name
 
+    def journal_path(
+        self,
+        base: Path | str | None = None,
+        partition: int | None = None,
+    ) -> Path:
+        return self.report_path(base, partition).with_suffix(".journal.jsonl")
+
 
 class PlanPartitionView(BaseModel):
     plan: Plan
@@ -1,4 +1,5 @@
 import re
+import statistics
 from datetime import timedelta
 from typing import Literal
 
@@ -15,23 +16,25 @@ from maat.model import (
 )
 from maat.utils.log import track
 
+_BENCH_MARKER = re.compile(r"MAAT_BENCH(?P<warmup>_WARMUP)?_NS=(?P<ns>\d+)")
+
 
 def analyse_report(report: Report):
     analyzers: list[Analyser] = [
         tests_summary,
         test_runner,
         incremental_build,
+        benchmark,  # NOTE: This analyser overrides timings parsed by incremental_build.
+        exclusive_timings,
         ls_memory,
         label,  # NOTE: This analyser depends on all previous ones.
     ]
 
-    jobs: list[tuple[Analyser, TestReport]] = [
-        (analyzer, test) for test in report.tests for analyzer in analyzers
-    ]
-
     with track("Analysing results"):
-        for analyser, test in jobs:
-            analyser(test)
+        for test in report.tests:
+            with test.restored_logs():
+                for analyser in analyzers:
+                    analyser(test)
 
 
 def tests_summary(test: TestReport):
@@ -45,7 +48,7 @@ def tests_summary(test: TestReport):
     # Find all test summary lines.
     matches = re.findall(
         r"^\[(?:out|err)]\s*(?:Error:\s*)?(?:Tests: |test result: ).*",
-        step.log_str,
+        _last_iteration(step.log_str),
         re.M,
     )
 
@@ -78,41 +81,182 @@ def test_runner(test: TestReport):
         test.analyses.test_runner = runner
 
 
+_BUILD_TIMINGS: list[tuple[str, str, tuple[str, ...]]] = [
+    # Analyses attribute, kind of the `MAAT_{kind}_BUILD_NS` timing marker, and steps which may
+    # report it, in order of preference. Older reports have cold builds measured inside
+    # incremental build steps, and only they have cold builds without tests.
+    ("cold_build_time", "COLD", ("incremental-build", "build")),
+    ("incremental_build_time", "INCR", ("incremental-build",)),
+    ("cold_build_no_test_time", "COLD", ("incremental-build-no-test",)),
+    ("incremental_build_no_test_time", "INCR", ("incremental-build-no-test",)),
+    # Edit scenarios, see `maat-edit-build`.
+    ("touch_leaf_build_time", "TOUCH_LEAF", ("edit-build",)),
+    ("add_fn_build_time", "ADD_FN", ("edit-build",)),
+    ("edit_fn_build_time", "EDIT_FN", ("edit-build",)),
+    ("add_test_build_time", "ADD_TEST", ("edit-build",)),
+]
+
+_WARM_BUILD_STEPS = {"incremental-build", "edit-build", "incremental-build-no-test"}
+"""Steps which start from the result of the ``build`` step, unless they measure a cold build."""
+
+
 def incremental_build(test: TestReport):
     """
-    Parse cold and incremental build timings from incremental-build step logs.
+    Parse cold and incremental build timings from build step logs.
     """
-    for step_name, incr_attr, cold_attr in [
-        ("incremental-build", "incremental_build_time", "cold_build_time"),
-        (
-            "incremental-build-no-test",
-            "incremental_build_no_test_time",
-            "cold_build_no_test_time",
-        ),
+    for attr, timing in _build_timings(test.steps).items():
+        setattr(test.analyses, attr, timing)
+
+
+def benchmark(test: TestReport):
+    """
+    Collect samples of steps repeated by ``maat-bench``.
+
+    Build steps report cold and incremental timings in every iteration, so these are collected
+    per iteration.
+    """
+    samples: dict[str, list[timedelta]] = {}
+
+    for step_name, attr in [
+        ("build", "build_time"),
+        ("lint", "lint_time"),
+        ("test", "test_time"),
     ]:
         step = test.step(step_name)
         if step is None or not step.was_executed:
             continue
+        if measured := [ns for _, ns in _bench_iterations(step.log_str)]:
+            samples[attr] = [_ns_to_timedelta(ns) for ns in measured]
+
+    steps = _timed_steps(test.steps)
+    for attr, kind, step_names in _BUILD_TIMINGS:
+        for step_name in step_names:
+            if (step := steps.get(step_name)) is None:
+                continue
+            measured = [
+                _ns_to_timedelta(int(m.group(1)))
+                for iteration, _ in _bench_iterations(step.log_str)
+                if (m := re.search(rf"MAAT_{kind}_BUILD_NS=(\d+)", iteration))
+            ]
+            if measured:
+                samples[attr] = measured
+                break
+
+    if samples:
+        test.analyses.benchmarks = samples
+
+
+def exclusive_timings(test: TestReport):
+    """
+    Extract timings of steps re-run in the exclusive timing phase.
+    """
+    analyses = test.analyses
+    succeeded = [step for step in test.exclusive_steps if step.exit_code == 0]
 
-        log = step.log_str
-        if log is None:
-            continue
-
-        cold_ns = re.search(r"MAAT_COLD_BUILD_NS=(\d+)", log)
-        if cold_ns:
+    for step in succeeded:
+        if step.name in ("build", "lint", "test") and step.log_str is not None:
             setattr(
-                test.analyses,
-                cold_attr,
-                timedelta(microseconds=int(cold_ns.group(1)) / 1_000),
+                analyses,
+                f"exclusive_{step.name}_time",
+                _median_bench_time(step.log_str) or step.execution_time,
             )
 
-        incr_ns = re.search(r"MAAT_INCR_BUILD_NS=(\d+)", log)
-        if incr_ns:
-            setattr(
-                test.analyses,
-                incr_attr,
-                timedelta(microseconds=int(incr_ns.group(1)) / 1_000),
-            )
+    for attr, timing in _build_timings(succeeded).items():
+        setattr(analyses, f"exclusive_{attr}", timing)
+
+
+def _build_timings(steps: list[StepReport]) -> dict[str, timedelta]:
+    """Cold and incremental build timings reported by the given steps, by Analyses attribute."""
+    by_name = _timed_steps(steps)
+
+    # If `build` has failed, steps which should have started from its result started from
+    # scratch, so their builds were not incremental.
+    build = by_name.get("build")
+    cold = {
+        step_name
+        for step_name in _WARM_BUILD_STEPS & by_name.keys()
+        if (build is None or build.exit_code != 0)
+        and _build_time(by_name[step_name].log_str, "COLD") is None
+    }
+
+    timings = {}
+    for attr, kind, step_names in _BUILD_TIMINGS:
+        for step_name in step_names:
+            step = by_name.get(step_name)
+            if step is not None and (timing := _build_time(step.log_str, kind)):
+                if step_name not in cold or kind == "COLD":
+                    timings[attr] = timing
+                break
+
+    return timings
+
+
+def _timed_steps(steps: list[StepReport]) -> dict[str, StepReport]:
+    return {
+        step.name: step
+        for step in steps
+        if step.was_executed and step.log_str is not None
+    }
+
+
+def _median_bench_time(log: str) -> timedelta | None:
+    """Median duration of measured iterations of a step run by ``maat-bench``, if it was."""
+    if measured := [ns for _, ns in _bench_iterations(log)]:
+        return _ns_to_timedelta(round(statistics.median(measured)))
+    return None
+
+
+def _build_time(log: str, kind: str) -> timedelta | None:
+    """
+    Parse a ``MAAT_{kind}_BUILD_NS`` timing, the median of measured iterations if the step
+    was run by ``maat-bench``.
+    """
+    pattern = rf"MAAT_{kind}_BUILD_NS=(\d+)"
+    if iterations := _bench_iterations(log):
+        measured = [
+            int(m.group(1))
+            for iteration, _ in iterations
+            if (m := re.search(pattern, iteration))
+        ]
+        if measured:
+            return _ns_to_timedelta(round(statistics.median(measured)))
+    elif m := re.search(pattern, log):
+        return _ns_to_timedelta(int(m.group(1)))
+    return None
+
+
+def _bench_iterations(log: str) -> list[tuple[str, int]]:
+    """
+    Split the log of a step run by ``maat-bench`` into measured iterations.
+
+    Returns the output of each measured iteration together with its duration in nanoseconds.
+    """
+    iterations = []
+    start = 0
+    for m in _BENCH_MARKER.finditer(log):
+        if not m.group("warmup"):
+            iterations.append((log[start : m.start()], int(m.group("ns"))))
+        start = m.end()
+    return iterations
+
+
+def _last_iteration(log: str) -> str:
+    """
+    Output of the last iteration of a step run by ``maat-bench``, or the whole log otherwise.
+
+    A failing iteration stops benchmarking, so it is the one after the last marker, if any.
+    """
+    markers = list(_BENCH_MARKER.finditer(log))
+    if not markers:
+        return log
+    if tail := log[markers[-1].end() :].strip():
+        return tail
+    start = markers[-2].end() if len(markers) > 1 else 0
+    return log[start : markers[-1].start()]
+
+
+def _ns_to_timedelta(ns: int) -> timedelta:
+    return timedelta(microseconds=ns / 1_000)
 
 
 def ls_memory(test: TestReport):
@@ -224,11 +368,11 @@ def _lint_label(lint: StepReport) -> Label:
 
     if (
         b"[out] error: scarb was not compiled with the `lint` command enabled"
-        in lint.log
-    ) or b"[out] error: no such command: `lint`" in lint.log:
+        in lint.full_log
+    ) or b"[out] error: no such command: `lint`" in lint.full_log:
         return Label.new(LabelCategory.LINT_BROKEN, "no linter")
 
-    if b"[err] error: unexpected argument '--deny-warnings' found" in lint.log:
+    if b"[err] error: unexpected argument '--deny-warnings' found" in lint.full_log:
         return Label.new(LabelCategory.LINT_BROKEN, "no --deny-warnings")
 
     return Label.new(LabelCategory.LINT_FAIL, "lint violations")
@@ -259,11 +403,11 @@ def _test_label(rep: StepReport, ts: TestsSummary | None) -> Label:
     runner = _detect_test_runner(rep)
     has_missing_summaries = _has_missing_test_summaries(rep)
     if ts is None or has_missing_summaries:
-        if b"Not enough gas to call function." in rep.log:
+        if b"Not enough gas to call function." in rep.full_log:
             return Label.new(LabelCategory.TEST_ERROR, "cairo-test: not enough gas")
-        elif b"[ERROR] Error while calling RPC method" in rep.log:
+        elif b"[ERROR] Error while calling RPC method" in rep.full_log:
             return Label.new(LabelCategory.TEST_ERROR, "snforge: rpc error")
-        elif b"Error: Failed setting up runner." in rep.log:
+        elif b"Error: Failed setting up runner." in rep.full_log:
             return Label.new(
                 LabelCategory.TEST_ERROR, "cairo-test: failed setting up runner"
             )
@@ -289,17 +433,19 @@ def _has_missing_test_summaries(step: StepReport) -> bool:
     if step.log_str is None:
         return False
 
+    log = _last_iteration(step.log_str)
+
     # Find all test summary lines
     matches = re.findall(
         r"^\[(?:out|err)]\s*(?:Error:\s*)?(?:Tests: |test result: ).*",
-        step.log_str,
+        log,
         re.M,
     )
 
     # Look for "Running test" lines to identify individual test runs
     test_runs = re.findall(
         r"^\[out]\s+Running test\s+.*",
-        step.log_str,
+        log,
         re.M,
     )
 
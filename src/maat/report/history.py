@@ -0,0 +1,115 @@
+import statistics
+from collections import defaultdict
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import NamedTuple, Self
+
+from maat.installation import REPO
+from maat.model import Test, TestReport
+from maat.report.io import read_report
+from maat.utils.log import log, track
+
+HISTORY_DEPTH = 5
+"""How many most recent observations of a test are taken into account when predicting."""
+
+DEFAULT_TEST_DURATION = timedelta(minutes=1)
+"""Predicted duration of a test that has never been run before."""
+
+HEAVY_TEST_DURATION = timedelta(minutes=20)
+"""Predicted duration of a test marked as heavy that has never been run before."""
+
+DEFAULT_TEST_PEAK_MEMORY_KB = 2 * 1024 * 1024
+"""Predicted peak memory of a test that has never been run before."""
+
+HEAVY_TEST_PEAK_MEMORY_KB = 8 * 1024 * 1024
+"""Predicted peak memory of a test marked as heavy that has never been run before."""
+
+HEAVY_TEST_THRESHOLD = timedelta(minutes=10)
+"""Tests whose recent runs take at least this long are considered heavy."""
+
+
+class _Observation(NamedTuple):
+    created_at: datetime
+    duration: timedelta
+    peak_memory_kb: int | None
+
+
+class History:
+    """
+    Per-test statistics collected from previous reports, used to predict how costly tests are.
+    """
+
+    def __init__(self, observations: dict[str, list[_Observation]] | None = None):
+        self._observations: dict[str, list[_Observation]] = defaultdict(list)
+        for name, items in (observations or {}).items():
+            # Keep only the most recent observations.
+            items = sorted(items, key=lambda o: o.created_at, reverse=True)
+            self._observations[name] = items[:HISTORY_DEPTH]
+
+    @classmethod
+    def load(cls, reports_dir: Path | None = None) -> Self:
+        if reports_dir is None:
+            reports_dir = REPO / "reports"
+
+        observations: dict[str, list[_Observation]] = defaultdict(list)
+        with track("Loading history from previous reports"):
+            for path in sorted(reports_dir.glob("*.json")):
+                try:
+                    report = read_report(path)
+                except (OSError, ValueError) as e:
+                    log(f"⚠️ Skipping report {path.name} in history: {e}")
+                    continue
+
+                for test in report.tests:
+                    observations[test.name].append(
+                        _Observation(
+                            created_at=report.created_at,
+                            duration=test.execution_time,
+                            peak_memory_kb=_peak_memory_kb(test),
+                        )
+                    )
+
+        return cls(observations)
+
+    def duration(self, name: str) -> timedelta | None:
+        """Median duration of recent runs of the given test, if it has ever been run."""
+        samples = [o.duration.total_seconds() for o in self._observations.get(name, [])]
+        if not samples:
+            return None
+        return timedelta(seconds=statistics.median(samples))
+
+    def is_heavy(self, name: str) -> bool | None:
+        """Whether the given test is heavy according to history, or ``None`` if it is unknown."""
+        if (duration := self.duration(name)) is None:
+            return None
+        return duration >= HEAVY_TEST_THRESHOLD
+
+    def predict_duration(self, test: Test) -> timedelta:
+        if (duration := self.duration(test.name)) is not None:
+            return duration
+        return HEAVY_TEST_DURATION if test.heavy else DEFAULT_TEST_DURATION
+
+    def peak_memory_kb(self, name: str) -> int | None:
+        """Highest peak memory among recent runs of the given test, if any was recorded."""
+        samples = [
+            o.peak_memory_kb
+            for o in self._observations.get(name, [])
+            if o.peak_memory_kb is not None
+        ]
+        return max(samples, default=None)
+
+    def predict_peak_memory_kb(self, test: Test) -> int:
+        if (peak := self.peak_memory_kb(test.name)) is not None:
+            return peak
+        return HEAVY_TEST_PEAK_MEMORY_KB if test.heavy else DEFAULT_TEST_PEAK_MEMORY_KB
+
+
+def _peak_memory_kb(test: TestReport) -> int | None:
+    samples = [
+        step.resources.peak_memory_kb
+        for step in test.steps
+        if step.resources is not None and step.resources.peak_memory_kb is not None
+    ]
+    if (ls_peak := test.analyses.ls_mem_post_analysis_peak_kb) is not None:
+        samples.append(ls_peak)
+    return max(samples, default=None)
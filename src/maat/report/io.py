@@ -8,9 +8,23 @@ def read_report(path: Path) -> Report:
     return Report.model_validate_json(path.read_bytes())
 
 
+_UNSAVED_STEP_FIELDS = {"__all__": {"log_spill"}}
+_UNSAVED_FIELDS = {
+    "tests": {
+        "__all__": {
+            "steps": _UNSAVED_STEP_FIELDS,
+            "exclusive_steps": _UNSAVED_STEP_FIELDS,
+        }
+    }
+}
+"""
+Fields kept only in the journal and the result cache; spill files are local to this machine.
+"""
+
+
 def save_report(report: Report, output: Path | IO):
     report.before_save()
-    json = report.model_dump_json(indent=2) + "\n"
+    json = report.model_dump_json(indent=2, exclude=_UNSAVED_FIELDS) + "\n"
     if isinstance(output, Path):
         output.write_text(json, encoding="utf-8")
     else:
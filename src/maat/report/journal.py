@@ -0,0 +1,69 @@
+import os
+import threading
+from pathlib import Path
+
+from pydantic import ValidationError
+
+from maat.model import TestReport
+from maat.utils.log import log
+
+
+class Journal:
+    """
+    Append-only JSONL file of finished test reports, written as soon as each test completes.
+
+    It lets an interrupted run be resumed without re-executing tests which have already finished.
+    Every line is flushed and synced to disk before ``append`` returns, so at most the line being
+    written when the process died can be lost.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def read(self) -> list[TestReport]:
+        """Read all complete entries, ignoring a truncated trailing line left by a crash."""
+        if not self.path.exists():
+            return []
+
+        tests = {}
+        with self.path.open("rb") as f:
+            for line_no, line in enumerate(f, start=1):
+                if not line.strip():
+                    continue
+                try:
+                    test = TestReport.model_validate_json(line)
+                except ValidationError as e:
+                    log(
+                        f"⚠️ Skipping corrupted journal entry {self.path}:{line_no}: {e}"
+                    )
+                    continue
+                # If a test has been journaled more than once, the last entry wins.
+                tests[test.name] = test
+        return list(tests.values())
+
+    def recover(self) -> list[TestReport]:
+        """
+        Read all complete entries and rewrite the journal with just them, so that new entries are
+        not appended to a truncated line.
+        """
+        tests = self.read()
+        tmp = self.path.with_name(self.path.name + ".tmp")
+        with tmp.open("wb") as f:
+            for test in tests:
+                f.write(test.model_dump_json().encode("utf-8") + b"\n")
+            f.flush()
+            os.fsync(f.fileno())
+        tmp.replace(self.path)
+        return tests
+
+    def append(self, test: TestReport):
+        line = test.model_dump_json().encode("utf-8") + b"\n"
+        with self._lock, self.path.open("ab") as f:
+            f.write(line)
+            f.flush()
+            os.fsync(f.fileno())
+
+    def clear(self):
+        with self._lock:
+            self.path.unlink(missing_ok=True)
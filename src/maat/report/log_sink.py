@@ -0,0 +1,152 @@
+import contextlib
+import functools
+import gzip
+import time
+from collections import deque
+from datetime import timedelta
+from pathlib import Path
+
+from pydantic import BaseModel
+
+from maat.utils.cache import cache_root
+from maat.utils.unique_id import snowflake_id
+
+LOG_HEAD_BYTES = 1024 * 1024
+"""How many bytes from the start of a step log are kept in memory and in the report."""
+
+LOG_TAIL_BYTES = 4 * 1024 * 1024
+"""How many bytes from the end of a step log are kept in memory and in the report."""
+
+LOG_SPILL_TTL = timedelta(days=7)
+"""
+Spilled log parts older than this are removed. Matches ``RESULT_CACHE_TTL``, so that cached results
+can restore their full logs for as long as they are used.
+"""
+
+
+class LogSpillRef(BaseModel):
+    """
+    Reference to the middle part of a step log which was omitted from ``StepReport.log``.
+
+    It is saved in the run journal and in the result cache, so that tests restored from them keep
+    their full logs, but not in reports, which outlive spill files and leave this machine.
+    """
+
+    path: Path
+    head_size: int
+    marker_size: int
+
+    def restore(self, log: bytes) -> bytes | None:
+        """
+        Splice the spilled part back into the truncated log it was omitted from, or return
+        ``None`` if the spill file is gone.
+        """
+        try:
+            with gzip.open(self.path, "rb") as reader:
+                middle = reader.read()
+        except (OSError, EOFError):
+            return None
+        head_end = self.head_size
+        tail_start = self.head_size + self.marker_size
+        return b"".join((log[:head_end], middle, log[tail_start:]))
+
+
+class LogSpill:
+    """
+    Middle part of a step log which did not fit in memory, stored in a compressed file.
+
+    Files live in ``$MAAT_LOG_SPILL``, or ``$XDG_CACHE_HOME/maat/logs`` by default, and are removed
+    after ``LOG_SPILL_TTL``.
+    """
+
+    def __init__(self, head_size: int):
+        self.head_size = head_size
+        self.size = 0
+        self.lines = 0
+        self.path = _spill_root() / f"{snowflake_id()}.log.gz"
+        # The writer outlives this call; it is closed in `finish`.
+        self._writer: gzip.GzipFile | None = gzip.open(  # noqa: SIM115
+            self.path, mode="wb", compresslevel=1
+        )
+
+    def write(self, line: bytes):
+        assert self._writer is not None, "log spill is already finished"
+        self._writer.write(line)
+        self.size += len(line)
+        self.lines += 1
+
+    def marker(self) -> bytes:
+        return (
+            f"[maat] ... {self.size} bytes ({self.lines} lines) omitted ...\n".encode()
+        )
+
+    def finish(self, marker_size: int) -> LogSpillRef:
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+        return LogSpillRef(
+            path=self.path, head_size=self.head_size, marker_size=marker_size
+        )
+
+
+@functools.cache
+def _spill_root() -> Path:
+    """Create the spill directory and remove expired spill files from it, once per process."""
+    root = cache_root("MAAT_LOG_SPILL", "logs")
+    root.mkdir(parents=True, exist_ok=True)
+    expired = time.time() - LOG_SPILL_TTL.total_seconds()
+    for path in root.glob("*.log.gz"):
+        # Files may be removed by a concurrent run at any point.
+        with contextlib.suppress(FileNotFoundError):
+            if path.stat().st_mtime < expired:
+                path.unlink()
+    return root
+
+
+class LogSink:
+    """
+    Collects a step log with a fixed memory ceiling.
+
+    The first ``LOG_HEAD_BYTES`` and the last ``LOG_TAIL_BYTES`` of the log are kept in memory.
+    Lines in between are spilled to a ``LogSpill``, and replaced with a marker line in the
+    truncated log, so that the full log can still be restored for analysis from ``LogSpillRef``.
+    """
+
+    def __init__(self):
+        self.size = 0
+        self.lines = 0
+        self._head = bytearray()
+        self._head_full = False
+        self._tail: deque[bytes] = deque()
+        self._tail_size = 0
+        self._spill: LogSpill | None = None
+
+    def write(self, line: bytes):
+        self.size += len(line)
+        self.lines += 1
+
+        if not self._head_full:
+            if len(self._head) + len(line) <= LOG_HEAD_BYTES:
+                self._head += line
+                return
+            self._head_full = True
+
+        self._tail.append(line)
+        self._tail_size += len(line)
+        while self._tail_size > LOG_TAIL_BYTES:
+            evicted = self._tail.popleft()
+            self._tail_size -= len(evicted)
+            if self._spill is None:
+                self._spill = LogSpill(head_size=len(self._head))
+            self._spill.write(evicted)
+
+    def finish(self) -> tuple[bytes, LogSpillRef | None]:
+        """Return the (possibly truncated) log and a reference to the spilled part, if any."""
+        chunks = [bytes(self._head)]
+        spill = None
+        if self._spill is not None:
+            marker = self._spill.marker()
+            spill = self._spill.finish(marker_size=len(marker))
+            chunks.append(marker)
+        chunks.extend(self._tail)
+        return b"".join(chunks), spill
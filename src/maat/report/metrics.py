@@ -6,7 +6,56 @@ from typing import Self
 from pydantic import BaseModel
 
 from maat.hardware import HardwareEnvironment
-from maat.model import Report, ReportMeta
+from maat.model import Report, ReportMeta, ResourceUsage
+from maat.utils.stats import mad, median_ci
+
+
+class StepResourceMetrics(BaseModel):
+    """Medians of resource usage of a step across all projects which have it recorded."""
+
+    median_cpu_user: timedelta
+    median_cpu_system: timedelta
+    median_cpu_throttled: timedelta
+    median_peak_memory_kb: int | None
+    median_io_read_bytes: int
+    median_io_write_bytes: int
+
+    @classmethod
+    def compute(cls, usages: list[ResourceUsage]) -> Self:
+        return cls(
+            median_cpu_user=_timedelta_median([u.cpu_user for u in usages]),
+            median_cpu_system=_timedelta_median([u.cpu_system for u in usages]),
+            median_cpu_throttled=_timedelta_median([u.cpu_throttled for u in usages]),
+            median_peak_memory_kb=_int_median(
+                [u.peak_memory_kb for u in usages if u.peak_memory_kb is not None]
+            ),
+            median_io_read_bytes=_int_median([u.io_read_bytes for u in usages]),
+            median_io_write_bytes=_int_median([u.io_write_bytes for u in usages]),
+        )
+
+
+class BenchmarkStats(BaseModel):
+    """Robust statistics of repeated measurements."""
+
+    median: timedelta
+    mad: timedelta
+    """Median absolute deviation from the median."""
+    ci_low: timedelta
+    ci_high: timedelta
+    """Bounds of the 95% confidence interval of the median."""
+    samples: int
+
+    @classmethod
+    def compute(cls, samples: list[timedelta]) -> Self:
+        seconds = [td.total_seconds() for td in samples]
+        ci_low, ci_high = median_ci(seconds)
+        return cls(
+            median=timedelta(seconds=statistics.median(seconds)),
+            mad=timedelta(seconds=mad(seconds)),
+            ci_low=timedelta(seconds=ci_low),
+            ci_high=timedelta(seconds=ci_high),
+            samples=len(samples),
+        )
 
 
 class Metrics(BaseModel):
@@ -15,8 +64,16 @@ class Metrics(BaseModel):
     scarb_version: str
     foundry_version: str
     maat_commit: str
+    workflow: int
+    """Version of the step workflow, timings are only comparable between equal versions."""
     created_at: datetime
     total_execution_time: timedelta
+    total_harness_overhead: timedelta
+    """
+    Total time spent in harness operations rather than tools: baking, volume lifecycle, and
+    container creation, start, teardown and snapshots of steps. Tests reused from the result
+    cache are not counted.
+    """
     total_projects: int
     """Total number of projects tested in the experiment."""
 
@@ -41,9 +98,19 @@ class Metrics(BaseModel):
     mean_ls_mem_post_analysis_peak_kb: int | None
     median_ls_mem_post_analysis_peak_kb: int | None
 
+    step_resources: dict[str, StepResourceMetrics] = {}
+    """Resource usage of successful steps, keyed by step name."""
+
+    benchmarks: dict[str, BenchmarkStats] = {}
+    """
+    Statistics of per-project medians of benchmarked timings, keyed by timing name.
+    Only present for experiments run with ``--benchmark-runs``.
+    """
+
     @classmethod
     def compute(cls, report: Report, meta: ReportMeta) -> Self:
         times: dict[str, list[timedelta]] = defaultdict(list)
+        resources: dict[str, list[ResourceUsage]] = defaultdict(list)
 
         total_tests = 0
         failed_tests = 0
@@ -52,22 +119,58 @@ class Metrics(BaseModel):
         incr_no_test_times: list[timedelta] = []
         ls_mem_post: list[int] = []
         ls_mem_post_peak: list[int] = []
+        harness_overhead = timedelta()
+        benchmark_medians: dict[str, list[timedelta]] = defaultdict(list)
 
         for test in report.tests:
+            analyses = test.analyses
+            benchmarks = analyses.benchmarks or {}
             for step_name in ["build", "lint", "test", "ls"]:
                 if step := test.step(step_name):
-                    if step.exit_code == 0 and step.execution_time:
+                    # Timings measured on an idle machine are not affected by concurrency noise.
+                    if t := getattr(analyses, f"exclusive_{step_name}_time", None):
+                        times[step_name].append(t)
+                    # A benchmarked step ran many times, so its execution time is meaningless.
+                    elif step.exit_code == 0 and (
+                        samples := benchmarks.get(f"{step_name}_time")
+                    ):
+                        times[step_name].append(_timedelta_median(samples))
+                    elif step.exit_code == 0 and step.execution_time:
                         times[step_name].append(step.execution_time)
+                    if step.exit_code == 0 and step.resources:
+                        resources[step_name].append(step.resources)
 
-            if t := test.analyses.incremental_build_time:
+            if t := (
+                analyses.exclusive_incremental_build_time
+                or analyses.incremental_build_time
+            ):
                 incr_times.append(t)
-            if t := test.analyses.incremental_build_no_test_time:
+            if t := (
+                analyses.exclusive_incremental_build_no_test_time
+                or analyses.incremental_build_no_test_time
+            ):
                 incr_no_test_times.append(t)
             if (v := test.analyses.ls_mem_post_analysis_kb) is not None:
                 ls_mem_post.append(v)
             if (v := test.analyses.ls_mem_post_analysis_peak_kb) is not None:
                 ls_mem_post_peak.append(v)
 
+            for timing, samples in benchmarks.items():
+                benchmark_medians[timing].append(_timedelta_median(samples))
+
+            # Cached results were not executed in this run, so their overhead did not happen.
+            if not test.cached:
+                harness_overhead += test.overhead.total
+                for step in test.steps:
+                    if overhead := step.overhead:
+                        for phase in (
+                            overhead.create,
+                            overhead.start,
+                            overhead.teardown,
+                            overhead.snapshot,
+                        ):
+                            harness_overhead += phase or timedelta()
+
             if summary := test.analyses.tests_summary:
                 total_tests += summary.total
                 failed_tests += summary.failed
@@ -92,8 +195,10 @@ class Metrics(BaseModel):
             scarb_version=report.scarb,
             foundry_version=report.foundry,
             maat_commit=report.maat_commit,
+            workflow=report.workflow,
             created_at=report.created_at,
             total_execution_time=report.total_execution_time,
+            total_harness_overhead=harness_overhead,
             total_projects=len(report.tests),
             hardware=report.hardware,
             mean_build_time=mean_build_time,
@@ -112,6 +217,14 @@ class Metrics(BaseModel):
             median_ls_mem_post_analysis_kb=_int_median(ls_mem_post),
             mean_ls_mem_post_analysis_peak_kb=_int_mean(ls_mem_post_peak),
             median_ls_mem_post_analysis_peak_kb=_int_median(ls_mem_post_peak),
+            step_resources={
+                step_name: StepResourceMetrics.compute(usages)
+                for step_name, usages in resources.items()
+            },
+            benchmarks={
+                timing: BenchmarkStats.compute(medians)
+                for timing, medians in benchmark_medians.items()
+            },
         )
 
 
@@ -3,19 +3,39 @@ from datetime import timedelta
 from typing import Literal, Self
 
 from maat import Report
-from maat.hardware import HardwareEnvironment
-from maat.model import Step, StepReport, Test, TestReport, Plan
+from maat.hardware import HardwareEnvironment, WorkerIsolation
+from maat.model import (
+    ConcurrencyDecision,
+    HarnessOverhead,
+    Plan,
+    ResourceUsage,
+    Step,
+    StepOverhead,
+    StepReport,
+    Test,
+    TestReport,
+)
+from maat.report.journal import Journal
+from maat.report.log_sink import LogSink
+from maat.report.result_cache import ResultCache
+from maat.utils.log import log
 
 
 class StepReporter:
     def __init__(self, report: StepReport):
         self._report = report
         self._timer: _ExecutionTimer | None = None
-        self._log_builder: list[bytes] = []
+        self._log_sink = LogSink()
 
     def set_exit_code(self, exit_code: int):
         self._report.exit_code = exit_code
 
+    def set_resources(self, resources: ResourceUsage | None):
+        self._report.resources = resources
+
+    def set_overhead(self, overhead: StepOverhead | None):
+        self._report.overhead = overhead
+
     def log(self, source: Literal["stdout", "stderr"], line: bytes):
         match source:
             case "stdout":
@@ -25,9 +45,9 @@ class StepReporter:
             case unknown:
                 raise ValueError(unknown)
 
-        self._log_builder.extend((b"[", source_tag, b"] ", line))
         if not line.endswith(b"\n"):
-            self._log_builder.append(b"\n")
+            line += b"\n"
+        self._log_sink.write(b"[" + source_tag + b"] " + line)
 
     def __enter__(self) -> Self:
         self._timer = _ExecutionTimer()
@@ -37,14 +57,25 @@ class StepReporter:
         assert self._timer is not None
         self._report.execution_time = self._timer.stop()
 
-        self._report.log = b"".join(self._log_builder)
+        self._report.log, self._report.log_spill = self._log_sink.finish()
+        self._report.log_size = self._log_sink.size
+        self._report.log_lines = self._log_sink.lines
 
         return False  # Don't suppress exceptions.
 
 
 class TestReporter:
-    def __init__(self, report: Report, test: Test):
+    def __init__(
+        self,
+        report: Report,
+        test: Test,
+        journal: Journal | None = None,
+        cache: ResultCache | None = None,
+    ):
         self._report = report
+        self._test = test
+        self._journal = journal
+        self._cache = cache
 
         self._test_report = test_report = TestReport(
             name=test.name,
@@ -53,6 +84,13 @@ class TestReporter:
         )
         report.tests.append(test_report)
 
+    @property
+    def overhead(self) -> HarnessOverhead:
+        return self._test_report.overhead
+
+    def set_worker(self, worker: WorkerIsolation | None):
+        self._test_report.worker = worker
+
     def step(self, step: Step) -> StepReporter:
         step_report = next(
             (sr for sr in self._test_report.steps if sr.name == step.name), None
@@ -62,20 +100,78 @@ class TestReporter:
         )
         return StepReporter(step_report)
 
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        # Only journal and cache tests which have been run to completion.
+        if exc_type is None:
+            if self._journal is not None:
+                self._journal.append(self._test_report)
+            if self._cache is not None:
+                self._cache.store(self._test, self._test_report)
+
+        return False  # Don't suppress exceptions.
+
 
 class Reporter:
-    def __init__(self, plan: Plan):
+    def __init__(
+        self,
+        plan: Plan,
+        journal: Journal | None = None,
+        cache: ResultCache | None = None,
+    ):
         self._report = Report(
             workspace=plan.workspace,
             scarb=plan.scarb,
             foundry=plan.foundry,
             total_execution_time=timedelta.max,
+            workflow=plan.workflow,
             hardware=[HardwareEnvironment.capture()],
+            skipped=plan.skipped,
         )
         self._timer = _ExecutionTimer()
+        self._journal = journal
+        self._cache = cache
 
     def test(self, test: Test) -> TestReporter:
-        return TestReporter(self._report, test)
+        return TestReporter(self._report, test, self._journal, self._cache)
+
+    def restore(self, tests: list[TestReport]):
+        """Add reports of tests finished by a previous, interrupted run."""
+        self._report.tests.extend(tests)
+
+    def reuse_cached(self, tests: list[Test]) -> list[Test]:
+        """Restore cached results of the given tests, and return the ones which must be run."""
+        if self._cache is None:
+            return tests
+
+        remaining = []
+        for test in tests:
+            if (cached := self._cache.load(test)) is not None:
+                self._report.tests.append(cached)
+                if self._journal is not None:
+                    self._journal.append(cached)
+            else:
+                remaining.append(test)
+
+        if reused := len(tests) - len(remaining):
+            log(f"♻️ Reusing cached results of {reused} tests")
+        return remaining
+
+    def exclusive_step(self, test: Test, step: Step) -> StepReporter:
+        """Report a step of the given, already finished test, re-run in the exclusive phase."""
+        test_report = next(tr for tr in self._report.tests if tr.name == test.name)
+        step_report = StepReport.blueprint(step)
+        test_report.exclusive_steps.append(step_report)
+        return StepReporter(step_report)
+
+    def isolation(self, workers: list[WorkerIsolation]):
+        """Record how host resources were split between workers on this machine."""
+        self._report.hardware[0].workers = workers
+
+    def concurrency_decision(self, decision: ConcurrencyDecision):
+        self._report.concurrency.append(decision)
 
     def finish(self) -> Report:
         self._report.total_execution_time = self._timer.stop()
@@ -0,0 +1,108 @@
+import hashlib
+import json
+import time
+from datetime import timedelta
+from pathlib import Path
+
+from pydantic import ValidationError
+
+from maat.model import EXIT_STEP_TIMEOUT, Plan, Test, TestReport
+from maat.utils.cache import cache_root, write_atomically
+from maat.utils.log import log
+
+RESULT_CACHE_VERSION = 2
+"""Bump to invalidate all cached results, e.g. when the meaning of a step report changes."""
+
+RESULT_CACHE_TTL = timedelta(days=7)
+"""Cached results older than this are ignored and removed, so that results do not go stale."""
+
+
+class ResultCache:
+    """
+    Content-addressed cache of test results, shared across runs on this machine.
+
+    A result is keyed by everything that determines how a test executes: the project revision,
+    the full definition of its steps, the Scarb and Foundry versions, the sandbox image ID and
+    execution modes which change what gets recorded (``modes``, e.g., ``--parallel-steps``).
+
+    Invalidation policy:
+
+    * any change to the key (new revision, toolchain, sandbox, step commands or environment,
+      execution modes) misses the cache;
+    * results older than ``RESULT_CACHE_TTL`` are dropped;
+    * results which might have been caused by the environment rather than the project are never
+      stored: failed setup steps (e.g., network errors during fetch), timed-out steps, and
+      unfinished tests;
+    * tests with host bind mounts (e.g., a local CairoLS binary) are never cached, because the
+      mounted files are not part of the key;
+    * bumping ``RESULT_CACHE_VERSION`` invalidates everything.
+
+    The cache lives in ``$MAAT_RESULT_CACHE``, or ``$XDG_CACHE_HOME/maat/results`` by default.
+    """
+
+    def __init__(
+        self,
+        plan: Plan,
+        modes: dict[str, bool] | None = None,
+        root: Path | None = None,
+    ):
+        self._plan = plan
+        self._modes = modes or {}
+        self._root = root or cache_root("MAAT_RESULT_CACHE", "results")
+
+    def load(self, test: Test) -> TestReport | None:
+        if (key := self._key(test)) is None:
+            return None
+
+        path = self._path(key)
+        try:
+            age = time.time() - path.stat().st_mtime
+        except FileNotFoundError:
+            return None
+
+        if age > RESULT_CACHE_TTL.total_seconds():
+            path.unlink(missing_ok=True)
+            return None
+
+        try:
+            report = TestReport.model_validate_json(path.read_bytes())
+        except (OSError, ValidationError) as e:
+            log(f"⚠️ Ignoring unreadable cached result of {test.name}: {e}")
+            path.unlink(missing_ok=True)
+            return None
+
+        report.cached = True
+        return report
+
+    def store(self, test: Test, report: TestReport):
+        if (key := self._key(test)) is None or not _is_cacheable(test, report):
+            return
+
+        write_atomically(self._path(key), report.model_dump_json())
+
+    def _key(self, test: Test) -> str | None:
+        if any(step.binds for step in test.steps):
+            return None
+
+        material = {
+            "version": RESULT_CACHE_VERSION,
+            "scarb": self._plan.scarb,
+            "foundry": self._plan.foundry,
+            "sandbox": self._plan.sandbox,
+            "modes": self._modes,
+            "test": test.model_dump(mode="json", exclude={"heavy"}),
+        }
+        encoded = json.dumps(material, sort_keys=True).encode("utf-8")
+        return hashlib.sha256(encoded).hexdigest()
+
+    def _path(self, key: str) -> Path:
+        return self._root / key[:2] / f"{key}.json"
+
+
+def _is_cacheable(test: Test, report: TestReport) -> bool:
+    for step, step_report in zip(test.steps, report.steps, strict=True):
+        if step_report.exit_code is None or step_report.exit_code == EXIT_STEP_TIMEOUT:
+            return False
+        if step.setup and step_report.exit_code != 0:
+            return False
+    return True
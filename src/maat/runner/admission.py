@@ -0,0 +1,162 @@
+import threading
+import time
+from contextlib import contextmanager
+from datetime import timedelta
+
+from maat.hardware import memory_available_kb, pressure_avg10
+from maat.model import ConcurrencyDecision, Test
+from maat.report.history import History
+from maat.report.reporter import Reporter
+from maat.runner.cancellation_token import CancellationToken
+from maat.utils.log import log
+
+type Admission = MemoryAdmission | PressureAdmission
+
+MEMORY_HEADROOM_KB = 1024 * 1024
+"""Memory always kept free for the orchestrator, Docker daemon and the rest of the host."""
+
+PRESSURE_LOW = 10.0
+"""PSI ``avg10`` (percent) below which, for all resources, another test may be started."""
+
+PRESSURE_HIGH = 40.0
+"""PSI ``avg10`` (percent) above which, for any resource, the concurrency limit is lowered."""
+
+PRESSURE_INTERVAL_SECS = 10.0
+"""Minimum time between two consecutive concurrency limit changes; matches PSI ``avg10`` window."""
+
+
+class MemoryAdmission:
+    """
+    Admits tests for execution only when their predicted peak memory fits in host memory.
+
+    The budget is the memory available when the executor starts, minus a headroom. A test is
+    admitted when predictions of all running tests plus its own fit the budget, and its own
+    prediction fits memory which is available right now. A test is always admitted when nothing
+    else is running, so predictions exceeding the budget cannot stall the run.
+
+    Admission is disabled (everything is admitted) if host memory cannot be inspected.
+    """
+
+    def __init__(self, history: History):
+        self._history = history
+        self._cond = threading.Condition()
+        self._reserved_kb = 0
+        self._running = 0
+
+        available = memory_available_kb()
+        self._budget_kb = (
+            None if available is None else max(available - MEMORY_HEADROOM_KB, 0)
+        )
+
+    @property
+    def enabled(self) -> bool:
+        return self._budget_kb is not None
+
+    @contextmanager
+    def admit(self, test: Test, ct: CancellationToken):
+        need_kb = self._history.predict_peak_memory_kb(test)
+
+        with self._cond:
+            if not self._fits(need_kb):
+                log(f"⏳ {test.name}: waiting for {need_kb // 1024} MiB of memory")
+                while not self._fits(need_kb):
+                    ct.raise_if_cancelled()
+                    # Free memory changes regardless of tests finishing, so poll it periodically.
+                    self._cond.wait(timeout=1.0)
+
+            self._reserved_kb += need_kb
+            self._running += 1
+
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._reserved_kb -= need_kb
+                self._running -= 1
+                self._cond.notify_all()
+
+    def _fits(self, need_kb: int) -> bool:
+        if self._budget_kb is None or self._running == 0:
+            return True
+
+        if self._reserved_kb + need_kb > self._budget_kb:
+            return False
+
+        available = memory_available_kb()
+        return available is None or need_kb <= available - MEMORY_HEADROOM_KB
+
+
+class PressureAdmission:
+    """
+    Adapts the number of concurrently running tests to Linux PSI (Pressure Stall Information).
+
+    Starts with a single test. While tests are waiting and CPU, memory and I/O pressure all stay
+    low, the limit is raised by one; when any pressure is high, it is lowered by one, so no new
+    tests are started until running ones finish. Running tests are never interrupted. The limit
+    changes at most once per ``PRESSURE_INTERVAL_SECS`` and every change is recorded in the report.
+
+    Admission is disabled (everything is admitted) if PSI is not available on this host.
+    """
+
+    def __init__(self, reporter: Reporter):
+        self._reporter = reporter
+        self._cond = threading.Condition()
+        self._running = 0
+        self._limit = 1
+        self._start = time.monotonic()
+        self._last_change = self._start
+        self.enabled = all(
+            pressure_avg10(resource) is not None for resource in ("cpu", "memory", "io")
+        )
+
+    @contextmanager
+    def admit(self, test: Test, ct: CancellationToken):
+        with self._cond:
+            while self.enabled and self._running >= self._adjust_limit():
+                ct.raise_if_cancelled()
+                self._cond.wait(timeout=1.0)
+
+            self._running += 1
+
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._running -= 1
+                self._adjust_limit()
+                self._cond.notify_all()
+
+    def _adjust_limit(self) -> int:
+        now = time.monotonic()
+        if now - self._last_change < PRESSURE_INTERVAL_SECS:
+            return self._limit
+
+        cpu = pressure_avg10("cpu")
+        memory = pressure_avg10("memory")
+        io = pressure_avg10("io")
+        pressures = [p for p in (cpu, memory, io) if p is not None]
+
+        if any(p > PRESSURE_HIGH for p in pressures) and self._limit > 1:
+            limit = self._limit - 1
+        elif all(p < PRESSURE_LOW for p in pressures) and self._running >= self._limit:
+            limit = self._limit + 1
+        else:
+            return self._limit
+
+        self._limit = limit
+        self._last_change = now
+        log(
+            f"🎚️ Concurrency limit set to {limit} "
+            f"(cpu: {cpu}%, memory: {memory}%, io: {io}%)"
+        )
+        self._reporter.concurrency_decision(
+            ConcurrencyDecision(
+                at=timedelta(seconds=now - self._start),
+                limit=limit,
+                running=self._running,
+                cpu_pressure=cpu,
+                memory_pressure=memory,
+                io_pressure=io,
+            )
+        )
+        return limit
@@ -1,35 +1,62 @@
 from python_on_whales import DockerClient, Image, Volume
 
 from maat.runner.cancellation_token import CancellationToken
-from maat.utils.docker import inspect_image
+from maat.runner.engine import DockerEngine, bind
+from maat.utils.docker import image_id, inspect_image
 
 
-def bake_volume(
+def bake_volumes(
     docker: DockerClient,
     image: Image | str,
-    volume: Volume,
-    mount: str,
+    volumes: list[tuple[Volume | str, str]],
     ct: CancellationToken,
-) -> Image:
+    engine: DockerEngine | None = None,
+) -> Image | str:
     """
-    Creates a new image derived from the provided one, with the provided volume baked as an extra
-    layer as if it was mounted at the specified path.
+    Creates a new image derived from the provided one, with the provided volumes baked as a single
+    extra layer as if they were mounted at the specified paths.
+
+    Files already present in the image and not older than their volume counterparts are not
+    copied, so the layer only holds what was actually changed.
+
+    With the Docker Engine API backend, only the new image's ID is returned.
     """
 
+    script = []
+    mounts = []
+    for idx, (volume, mount) in enumerate(volumes):
+        source = f"/bake-volume-mnt/{idx}"
+        mounts.append((volume, source))
+        script.append(f"mkdir -p '{mount}' && cp -a -u '{source}/.' '{mount}'")
+
+    command = ["bash", "-c", " && ".join(script)]
+
+    if engine is not None:
+        container = engine.create(
+            image=image_id(image),
+            command=command,
+            binds=[bind(mount) for mount in mounts],
+            labels=ct.container_labels,
+        )
+        try:
+            engine.start(container)
+            if (code := engine.wait(container)) != 0 and not ct.is_cancelled:
+                raise RuntimeError(f"baking volumes failed with exit code: {code}")
+
+            return engine.commit(container)
+        finally:
+            engine.remove_container(container)
+
     image = inspect_image(image, docker)
 
     with docker.container.run(
         image=image,
-        command=[
-            "bash",
-            "-c",
-            f"mkdir -p '{mount}' && cp -a /bake-volume-mnt/. '{mount}'",
-        ],
+        command=command,
         detach=True,
         labels=ct.container_labels,
-        volumes=[(volume, "/bake-volume-mnt")],
+        volumes=mounts,
     ) as container:
         if (code := docker.container.wait(container)) != 0 and not ct.is_cancelled:
-            raise RuntimeError(f"baking volume failed with exit code: {code}")
+            raise RuntimeError(f"baking volumes failed with exit code: {code}")
 
         return container.commit()
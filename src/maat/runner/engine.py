@@ -0,0 +1,472 @@
+import asyncio
+import json
+import os
+import struct
+import threading
+from collections.abc import Coroutine, Sequence
+from queue import Queue
+from typing import Any
+from urllib.parse import urlencode
+
+from python_on_whales import DockerException, Volume
+
+DOCKER_SOCKET = "/var/run/docker.sock"
+API_VERSION = "v1.41"
+MAX_CONNECTIONS = 32
+"""Maximum number of pooled connections used for short requests."""
+
+_STREAM_SOURCES = {1: "stdout", 2: "stderr"}
+
+
+class DockerEngine:
+    """
+    Docker Engine API client talking to the daemon over its unix socket.
+
+    Unlike ``python_on_whales``, which spawns a ``docker`` CLI process for every operation and
+    needs a thread to pump output of every container, this client runs all requests and log
+    streams of all containers on a single asyncio event loop (in a background thread) and reuses
+    keep-alive connections. Methods are synchronous and thread-safe, so they can be called from
+    executor worker threads.
+
+    Errors reported by the daemon are raised as ``DockerException`` with exit code 125, the same
+    as the ``docker`` CLI uses for daemon errors.
+    """
+
+    def __init__(self, socket_path: str | None = None):
+        self._socket_path = socket_path or _socket_path_from_env()
+        self._idle: list[_Connection] = []
+        self._slots = asyncio.Semaphore(MAX_CONNECTIONS)
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(
+            target=self._loop.run_forever, name="maat-docker-engine", daemon=True
+        )
+        self._thread.start()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+        return False
+
+    def close(self):
+        async def _close():
+            for conn in self._idle:
+                conn.close()
+            self._idle.clear()
+
+        self._call(_close())
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop.close()
+
+    def create_volume(self, name: str):
+        self._call(self._request("POST", "/volumes/create", body={"Name": name}))
+
+    def remove_volume(self, name: str):
+        self._call(self._request("DELETE", f"/volumes/{name}", expect=(204, 404)))
+
+    def remove_image(self, image: str):
+        self._call(
+            self._request(
+                "DELETE", f"/images/{image}", query={"force": "1"}, expect=(200, 404)
+            )
+        )
+
+    def kill(self, container: str):
+        self._call(
+            self._request(
+                "POST", f"/containers/{container}/kill", expect=(204, 404, 409)
+            )
+        )
+
+    def create(
+        self,
+        image: str,
+        command: list[str],
+        name: str | None = None,
+        env: dict[str, str] | None = None,
+        workdir: str | None = None,
+        binds: list[str] | None = None,
+        labels: dict[str, str] | None = None,
+    ) -> str:
+        """Create a container and return its ID."""
+        config = _container_config(image, command, env, workdir, binds, labels)
+        query = {"name": name} if name is not None else None
+        created = self._call(
+            self._request("POST", "/containers/create", query=query, body=config)
+        )
+        return created["Id"]
+
+    def start(self, container: str):
+        self._call(
+            self._request("POST", f"/containers/{container}/start", expect=(204, 304))
+        )
+
+    def wait(self, container: str) -> int:
+        """Wait for the container to stop and return its exit code."""
+
+        async def _wait() -> int:
+            conn = await _Connection.open(self._socket_path)
+            try:
+                await conn.send("POST", _url(f"/containers/{container}/wait"))
+                return await _read_wait_result(conn, container)
+            finally:
+                conn.close()
+
+        return self._call(_wait())
+
+    def commit(self, container: str) -> str:
+        """Create an image from the container's changes and return its ID."""
+        committed = self._call(
+            self._request("POST", "/commit", query={"container": container})
+        )
+        return committed["Id"]
+
+    def inspect(self, container: str) -> dict[str, Any]:
+        return self._call(self._request("GET", f"/containers/{container}/json"))
+
+    def remove_container(self, container: str):
+        self._call(
+            self._request(
+                "DELETE",
+                f"/containers/{container}",
+                query={"force": "1"},
+                expect=(204, 404),
+            )
+        )
+
+    def run(
+        self,
+        image: str,
+        command: list[str],
+        name: str,
+        env: dict[str, str] | None = None,
+        workdir: str | None = None,
+        binds: list[str] | None = None,
+        labels: dict[str, str] | None = None,
+        cpuset_cpus: str | None = None,
+        memory_mb: int | None = None,
+    ) -> Queue:
+        """
+        Run a container, streaming its output.
+
+        The container is not removed once it exits, so that it can be inspected.
+
+        Returns a queue receiving a ``("created", container_id, None)`` event once the container
+        is created, ``("line", source, line)`` events for every output line, followed by
+        ``("done", None, None)`` if the container exited with code 0,
+        ``("docker_error", DockerException, None)`` if it did not, or ``("error", Exception, None)``
+        if anything else went wrong.
+        """
+        events: Queue = Queue()
+
+        async def _run():
+            try:
+                exit_code = await self._run(
+                    events,
+                    image,
+                    command,
+                    name,
+                    env,
+                    workdir,
+                    binds,
+                    labels,
+                    cpuset_cpus,
+                    memory_mb,
+                )
+                if exit_code == 0:
+                    events.put(("done", None, None))
+                else:
+                    events.put(
+                        (
+                            "docker_error",
+                            DockerException(["run", name], return_code=exit_code),
+                            None,
+                        )
+                    )
+            except DockerException as exc:
+                events.put(("docker_error", exc, None))
+            except Exception as exc:  # noqa: BLE001 - re-raised by the consumer of events
+                events.put(("error", exc, None))
+
+        asyncio.run_coroutine_threadsafe(_run(), self._loop)
+        return events
+
+    async def _run(
+        self,
+        events: Queue,
+        image: str,
+        command: list[str],
+        name: str,
+        env: dict[str, str] | None,
+        workdir: str | None,
+        binds: list[str] | None,
+        labels: dict[str, str] | None,
+        cpuset_cpus: str | None,
+        memory_mb: int | None,
+    ) -> int:
+        config = _container_config(
+            image, command, env, workdir, binds, labels, cpuset_cpus, memory_mb
+        )
+        created = await self._request(
+            "POST", "/containers/create", query={"name": name}, body=config
+        )
+        container = created["Id"]
+        events.put(("created", container, None))
+
+        attach = await _Connection.open(self._socket_path)
+        waiter = await _Connection.open(self._socket_path)
+        try:
+            # Attach before starting, so no output is lost.
+            await attach.send(
+                "POST",
+                _url(
+                    f"/containers/{container}/attach",
+                    {"stream": "1", "stdout": "1", "stderr": "1"},
+                ),
+                headers={"Connection": "Upgrade", "Upgrade": "tcp"},
+            )
+            status, headers = await attach.read_head()
+            if status not in (101, 200):
+                raise _error(
+                    ["attach", container], await attach.read_body(status, headers)
+                )
+
+            # Start waiting before starting the container, so that its exit cannot be missed.
+            await waiter.send("POST", _url(f"/containers/{container}/wait"))
+
+            try:
+                await self._request(
+                    "POST", f"/containers/{container}/start", expect=(204, 304)
+                )
+            except Exception:
+                await self._request(
+                    "DELETE",
+                    f"/containers/{container}",
+                    query={"force": "1"},
+                    expect=(204, 404),
+                )
+                raise
+
+            await _demultiplex(attach.reader, events)
+            return await _read_wait_result(waiter, container)
+        finally:
+            attach.close()
+            waiter.close()
+
+    def _call[T](self, coro: Coroutine[Any, Any, T]) -> T:
+        return asyncio.run_coroutine_threadsafe(coro, self._loop).result()
+
+    async def _request(
+        self,
+        method: str,
+        path: str,
+        query: dict[str, str] | None = None,
+        body: Any = None,
+        expect: tuple[int, ...] = (200, 201, 204),
+    ) -> Any:
+        async with self._slots:
+            # An idle connection may have been closed by the daemon meanwhile, so retry once
+            # on a new connection if a reused one fails.
+            for attempt in range(2):
+                reused = bool(self._idle)
+                conn = (
+                    self._idle.pop()
+                    if reused
+                    else await _Connection.open(self._socket_path)
+                )
+                try:
+                    await conn.send(method, _url(path, query), body=body)
+                    status, headers = await conn.read_head()
+                    data = await conn.read_body(status, headers, method)
+                except (ConnectionError, asyncio.IncompleteReadError):
+                    conn.close()
+                    if reused and attempt == 0:
+                        continue
+                    raise
+                break
+
+            if conn.keep_alive:
+                self._idle.append(conn)
+            else:
+                conn.close()
+
+        if status not in expect:
+            raise _error([method, path], data)
+
+        if data and headers.get("content-type", "").startswith("application/json"):
+            return json.loads(data)
+        return None
+
+
+class _Connection:
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.reader = reader
+        self.writer = writer
+        self.keep_alive = True
+
+    @classmethod
+    async def open(cls, socket_path: str) -> "_Connection":
+        reader, writer = await asyncio.open_unix_connection(socket_path)
+        return cls(reader, writer)
+
+    def close(self):
+        self.keep_alive = False
+        self.writer.close()
+
+    async def send(
+        self,
+        method: str,
+        target: str,
+        body: Any = None,
+        headers: dict[str, str] | None = None,
+    ):
+        lines = [f"{method} {target} HTTP/1.1", "Host: docker"]
+        for key, value in (headers or {}).items():
+            lines.append(f"{key}: {value}")
+
+        payload = b""
+        if body is not None:
+            payload = json.dumps(body).encode("utf-8")
+            lines.append("Content-Type: application/json")
+        lines.append(f"Content-Length: {len(payload)}")
+
+        self.writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1") + payload)
+        await self.writer.drain()
+
+    async def read_head(self) -> tuple[int, dict[str, str]]:
+        status_line = await self.reader.readline()
+        if not status_line:
+            raise ConnectionResetError("connection closed by the daemon")
+        status = int(status_line.split()[1])
+
+        headers: dict[str, str] = {}
+        while (line := await self.reader.readline()) not in (b"\r\n", b"\n", b""):
+            key, _, value = line.decode("latin-1").partition(":")
+            headers[key.strip().lower()] = value.strip()
+
+        if headers.get("connection", "").lower() == "close":
+            self.keep_alive = False
+        return status, headers
+
+    async def read_body(
+        self, status: int, headers: dict[str, str], method: str = "POST"
+    ) -> bytes:
+        # These responses never have a body, and dockerd sends no Content-Length with them, so
+        # reading until EOF would block forever on a keep-alive connection.
+        if method == "HEAD" or 100 <= status < 200 or status in (204, 304):
+            return b""
+        if headers.get("transfer-encoding", "").lower() == "chunked":
+            chunks = []
+            while True:
+                size = int((await self.reader.readline()).split(b";")[0], 16)
+                if size == 0:
+                    # Skip trailers.
+                    while (await self.reader.readline()) not in (b"\r\n", b"\n", b""):
+                        pass
+                    return b"".join(chunks)
+                chunks.append(await self.reader.readexactly(size))
+                await self.reader.readexactly(2)
+        elif (length := headers.get("content-length")) is not None:
+            return await self.reader.readexactly(int(length))
+        else:
+            self.keep_alive = False
+            return await self.reader.read()
+
+
+async def _demultiplex(reader: asyncio.StreamReader, events: Queue):
+    """
+    Split a multiplexed attach stream into stdout/stderr lines.
+
+    Each frame starts with an 8-byte header: stream type, three zero bytes and payload size.
+    """
+    buffers = {source: b"" for source in _STREAM_SOURCES.values()}
+    while True:
+        try:
+            header = await reader.readexactly(8)
+        except asyncio.IncompleteReadError:
+            break
+        stream_type, size = struct.unpack(">BxxxL", header)
+        payload = await reader.readexactly(size)
+        source = _STREAM_SOURCES.get(stream_type)
+        if source is None:
+            continue
+
+        *lines, buffers[source] = (buffers[source] + payload).split(b"\n")
+        for line in lines:
+            events.put(("line", source, line + b"\n"))
+
+    for source, rest in buffers.items():
+        if rest:
+            events.put(("line", source, rest))
+
+
+async def _read_wait_result(conn: _Connection, container: str) -> int:
+    status, headers = await conn.read_head()
+    data = await conn.read_body(status, headers)
+    if status != 200:
+        raise _error(["wait", container], data)
+    return json.loads(data)["StatusCode"]
+
+
+def _container_config(
+    image: str,
+    command: list[str],
+    env: dict[str, str] | None,
+    workdir: str | None,
+    binds: list[str] | None,
+    labels: dict[str, str] | None,
+    cpuset_cpus: str | None = None,
+    memory_mb: int | None = None,
+) -> dict[str, Any]:
+    config = {
+        "Image": image,
+        "Cmd": command,
+        "Env": [f"{k}={v}" for k, v in (env or {}).items()],
+        "Labels": labels or {},
+        "AttachStdout": True,
+        "AttachStderr": True,
+        "HostConfig": {"Binds": binds or []},
+    }
+    if workdir is not None:
+        config["WorkingDir"] = workdir
+    if cpuset_cpus is not None:
+        config["HostConfig"]["CpusetCpus"] = cpuset_cpus
+    if memory_mb is not None:
+        config["HostConfig"]["Memory"] = memory_mb * 1024 * 1024
+    return config
+
+
+def bind(spec: Sequence[str | Volume]) -> str:
+    """Format a ``(source, target[, mode])`` volume spec, as accepted by ``python_on_whales``."""
+    source, *rest = spec
+    if isinstance(source, Volume):
+        source = source.name
+    return ":".join([source, *rest])
+
+
+def _url(path: str, query: dict[str, str] | None = None) -> str:
+    url = f"/{API_VERSION}{path}"
+    if query:
+        url += "?" + urlencode(query)
+    return url
+
+
+def _error(command: list[str], data: bytes) -> DockerException:
+    try:
+        message = json.loads(data)["message"]
+    except (ValueError, KeyError, TypeError):
+        message = data.decode("utf-8", errors="replace")
+    return DockerException(command, return_code=125, stderr=message.encode("utf-8"))
+
+
+def _socket_path_from_env() -> str:
+    host = os.environ.get("DOCKER_HOST")
+    if not host:
+        return DOCKER_SOCKET
+    if not host.startswith("unix://"):
+        raise ValueError(
+            f"Docker Engine API backend only supports unix sockets, got: {host}"
+        )
+    return host.removeprefix("unix://")
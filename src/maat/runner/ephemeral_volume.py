@@ -1,28 +1,62 @@
+import time
+from collections.abc import Callable, Iterator
 from contextlib import contextmanager
+from datetime import timedelta
 
 from python_on_whales import DockerClient, Volume
 from retry import retry
 
+from maat.model import HarnessOverhead
+from maat.runner.engine import DockerEngine
 from maat.utils.unique_id import snowflake_id
 
 
 @contextmanager
-def ephemeral_volume(docker: DockerClient):
+def ephemeral_volume(
+    docker: DockerClient,
+    engine: DockerEngine | None = None,
+    overhead: HarnessOverhead | None = None,
+) -> Iterator[Volume | str]:
+    """
+    Create a volume which is removed on exit.
+
+    With the Docker Engine API backend, the volume is created through it and only its name is
+    yielded. If ``overhead`` is given, time spent creating and removing the volume is added to it.
+    """
     volume_name = f"maat-{snowflake_id()}"
 
-    # noinspection PyBroadException
-    try:
-        docker.volume.remove(volume_name=volume_name)
-    except Exception:
-        pass
+    start = time.perf_counter()
+    if engine is not None:
+        engine.remove_volume(volume_name)
+        engine.create_volume(volume_name)
+        volume = volume_name
+        remove = lambda: engine.remove_volume(volume_name)
+    else:
+        # noinspection PyBroadException
+        try:
+            docker.volume.remove(volume_name=volume_name)
+        except Exception:
+            pass
+
+        volume = docker.volume.create(volume_name=volume_name)
+        remove = volume.remove
+    if overhead is not None:
+        overhead.volume_create += timedelta(seconds=time.perf_counter() - start)
 
-    volume = docker.volume.create(volume_name=volume_name)
     try:
         yield volume
     finally:
-        _remove_volume(volume)
+        start = time.perf_counter()
+        attempts = []
+        try:
+            _remove_volume(remove, attempts)
+        finally:
+            if overhead is not None:
+                overhead.volume_remove += timedelta(seconds=time.perf_counter() - start)
+                overhead.volume_remove_attempts += len(attempts)
 
 
 @retry(tries=5, delay=0.1, backoff=2)
-def _remove_volume(volume: Volume):
-    volume.remove()
+def _remove_volume(remove: Callable[[], None], attempts: list[None]):
+    attempts.append(None)
+    remove()
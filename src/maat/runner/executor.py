@@ -1,37 +1,71 @@
 import os
+import tempfile
 import threading
 import time
 import traceback
+from collections.abc import Callable, Iterable, Iterator
 from concurrent.futures import ThreadPoolExecutor
-from contextlib import ExitStack
+from contextlib import ExitStack, contextmanager, nullcontext
+from dataclasses import dataclass, field
+from datetime import UTC, datetime, timedelta
 from pathlib import Path
 from queue import Empty, Queue
+from typing import Literal, Self
 
-from python_on_whales import DockerClient, DockerException, Image, Volume
+from python_on_whales import Container, DockerClient, DockerException, Image, Volume
+from python_on_whales.exceptions import NoSuchContainer
 
+from maat.hardware import WorkerIsolation
 from maat.model import (
     EXIT_RUNNER_SKIPPED,
     EXIT_STEP_TIMEOUT,
     Plan,
     PlanPartitionView,
+    Step,
+    StepOverhead,
     Test,
 )
+from maat.report.history import History
 from maat.report.reporter import Reporter, StepReporter
-from maat.runner.bake_volume import bake_volume
+from maat.runner.admission import Admission, MemoryAdmission, PressureAdmission
+from maat.runner.bake_volume import bake_volumes
 from maat.runner.cancellation_token import CancellationToken, CancelledException
+from maat.runner.engine import DockerEngine, bind
 from maat.runner.ephemeral_volume import ephemeral_volume
-from maat.sandbox import MAAT_CACHE, MAAT_WORKBENCH
+from maat.runner.isolation import WorkerPool, thread_env
+from maat.runner.planner import TIMING_STEPS
+from maat.runner.scheduler import longest_first
+from maat.runner.telemetry import SAMPLE_INTERVAL_SECS, CgroupSampler
+from maat.runner.work_queue import WorkQueue
+from maat.sandbox import MAAT_CACHE, MAAT_SHARED_CACHE, MAAT_WORKBENCH
+from maat.utils.docker import image_id
 from maat.utils.log import log, track, uptime
 from maat.utils.shell import split_command
 from maat.utils.slugify import slugify
 from maat.utils.unique_id import snowflake_id
 
+type ConcurrencyMode = Literal["memory", "pressure"]
+type DockerBackend = Literal["cli", "engine"]
+
+EXEC_KILL_GRACE_SECS = 30
+"""Time a step's process run with docker exec has to exit after its timeout, before SIGKILL."""
+
+MAAT_SNAPSHOT = "/mnt/maat-snapshot"
+"""Path where a long-lived test container keeps the initial state of cache and workbench."""
+
 
 def execute_plan(
     plan: Plan,
     jobs: int | None,
     docker: DockerClient,
     reporter: Reporter,
+    history: History | None = None,
+    concurrency: ConcurrencyMode = "memory",
+    exec_steps: bool = False,
+    docker_backend: DockerBackend = "cli",
+    isolate: bool = False,
+    exclusive_timings: bool = False,
+    parallel_steps: bool = False,
 ):
     for partition in plan.partition_views():
         execute_plan_partition(
@@ -39,6 +73,13 @@ def execute_plan(
             jobs=jobs,
             docker=docker,
             reporter=reporter,
+            history=history,
+            concurrency=concurrency,
+            exec_steps=exec_steps,
+            docker_backend=docker_backend,
+            isolate=isolate,
+            exclusive_timings=exclusive_timings,
+            parallel_steps=parallel_steps,
         )
 
 
@@ -47,33 +88,145 @@ def execute_plan_partition(
     jobs: int | None,
     docker: DockerClient,
     reporter: Reporter,
+    history: History | None = None,
+    concurrency: ConcurrencyMode = "memory",
+    exec_steps: bool = False,
+    docker_backend: DockerBackend = "cli",
+    queue: WorkQueue | None = None,
+    isolate: bool = False,
+    exclusive_timings: bool = False,
+    parallel_steps: bool = False,
 ):
-    jobs = determine_jobs_amount(jobs)
+    """
+    Execute all tests of the given plan partition.
+
+    If ``exec_steps`` is set, non-setup steps of each test are executed with docker exec in a
+    single long-lived container, instead of starting a new container for each step.
+
+    If ``docker_backend`` is ``engine``, volumes, images and step containers are managed through
+    the Docker Engine API (see ``DockerEngine``) instead of the ``docker`` CLI. Steps run with
+    docker exec and cancellation still go through the CLI.
+
+    If ``queue`` is given, tests are claimed one by one from this queue shared with runners of
+    other partitions, instead of running exactly the tests of this partition.
+
+    If ``isolate`` is set, every worker gets dedicated CPUs and a share of memory, which limit
+    containers of tests it executes, and tools in these containers are told to use only as many
+    threads as there are dedicated CPUs (see ``WorkerPool``).
+
+    If ``exclusive_timings`` is set, baked images of all tests are kept until all tests finish.
+    Then, timing-relevant steps of every test are run again, one at a time, so that their timings
+    are not affected by other tests running alongside.
+
+    If ``parallel_steps`` is set, non-setup steps of a test are started as soon as the steps they
+    need (see ``Step.needs``) have finished, instead of one after another. At most ``jobs`` step
+    containers run at once across all tests, so this only fills otherwise idle job slots.
+    Ignored for tests run with ``exec_steps``.
+    """
+    if history is None:
+        history = History()
+
+    admission: Admission
+    match concurrency:
+        case "memory":
+            admission = MemoryAdmission(history)
+        case "pressure":
+            admission = PressureAdmission(reporter)
+        case unknown:
+            raise ValueError(unknown)
+
+    jobs = determine_jobs_amount(jobs, admission)
     ct = CancellationToken()
 
+    workers: WorkerPool | None = None
+    if isolate:
+        workers = WorkerPool(jobs)
+        jobs = len(workers.workers)
+        reporter.isolation(workers.workers)
+
+    # With a work queue, cached results are reused as tests are claimed.
+    tests = partition.test_suite.tests
+    if queue is None:
+        tests = reporter.reuse_cached(tests)
+
+    # Shared by all step containers, if steps of a test may run in parallel.
+    step_slots = threading.BoundedSemaphore(jobs) if parallel_steps else None
+
+    # Tests with their baked images, kept for the exclusive timing phase.
+    baked: list[tuple[Test, Image | str]] | None = [] if exclusive_timings else None
+
     with (
+        DockerEngine() if docker_backend == "engine" else nullcontext() as engine,
+        # Run-wide store of Scarb packages, see `maat-shared-cache` agent script.
+        ephemeral_volume(docker, engine) as shared_cache_volume,
+        ExitStack() as baked_images,
         ThreadPoolExecutor(max_workers=jobs) as pool,
     ):
+        if baked is not None:
+            baked_images.callback(_remove_images, docker, baked, engine)
 
         def worker_main(current_test: Test):
             try:
-                _execute_test(
-                    test=current_test,
-                    sandbox=partition.plan.sandbox,
-                    ct=ct,
-                    docker=docker,
-                    reporter=reporter,
-                )
+                with (
+                    admission.admit(current_test, ct),
+                    workers.acquire()
+                    if workers is not None
+                    else nullcontext() as worker,
+                ):
+                    _execute_test(
+                        test=current_test,
+                        sandbox=partition.plan.sandbox,
+                        shared_cache_volume=shared_cache_volume,
+                        exec_steps=exec_steps,
+                        ct=ct,
+                        docker=docker,
+                        engine=engine,
+                        reporter=reporter,
+                        worker=worker,
+                        baked=baked,
+                        step_slots=step_slots,
+                    )
             except CancelledException:
                 pass
             except Exception:
                 traceback.print_exc()
 
-        for test in partition.test_suite.tests:
-            pool.submit(worker_main, test)
+        def queue_worker_main():
+            while not ct.is_cancelled and (
+                current_test := queue.claim(partition.partition)
+            ):
+                if reporter.reuse_cached([current_test]):
+                    worker_main(current_test)
+
+                if ct.is_cancelled:
+                    # Let another runner, or this one when resumed, pick it up.
+                    queue.release(current_test)
+                else:
+                    queue.complete(current_test)
 
         try:
+            if queue is not None:
+                for _ in range(jobs):
+                    pool.submit(queue_worker_main)
+            else:
+                # Workers pick tests in submission order, so submit the longest ones first.
+                for test in longest_first(tests, history):
+                    pool.submit(worker_main, test)
+
             pool.shutdown(wait=True)
+
+            if baked:
+                with track("Measuring timings exclusively"):
+                    for test, image in baked:
+                        _measure_exclusively(
+                            test=test,
+                            image=image,
+                            shared_cache_volume=shared_cache_volume,
+                            ct=ct,
+                            docker=docker,
+                            engine=engine,
+                            reporter=reporter,
+                        )
         except KeyboardInterrupt:
             log("⚠️ Cancelling experiment, sending SIGKILL to all containers...")
             ct.cancel(docker)
@@ -85,31 +238,129 @@ def execute_plan_partition(
 def _execute_test(
     test: Test,
     sandbox: Image | str,
+    shared_cache_volume: Volume | str,
+    exec_steps: bool,
     ct: CancellationToken,
     docker: DockerClient,
+    engine: DockerEngine | None,
     reporter: Reporter,
+    worker: WorkerIsolation | None = None,
+    baked: list[tuple[Test, Image | str]] | None = None,
+    step_slots: threading.Semaphore | None = None,
 ):
     ct.raise_if_cancelled()
 
-    test_reporter = reporter.test(test)
+    # Steps' own variables take precedence, so that they can still be tuned with --extra-env.
+    isolation_env = thread_env(worker) if worker is not None else {}
+
+    with (
+        track(test.name),
+        reporter.test(test) as test_reporter,
+        ExitStack() as images,
+        # Snapshots of steps whose artifacts are reused by other steps.
+        # These are derived from the baked image, so must be removed before it.
+        _Artifacts(test, docker, engine) as artifacts,
+        ExitStack() as volumes,
+    ):
+        test_reporter.set_worker(worker)
 
-    with track(test.name), ExitStack() as volumes:
         # Create cache and workbench volumes which contents will be mutated during the setup phase.
         # We will bake these volumes' contents into the sandbox image and delete them afterwards.
-        cache_volume = volumes.enter_context(ephemeral_volume(docker))
+        cache_volume = volumes.enter_context(
+            ephemeral_volume(docker, engine, test_reporter.overhead)
+        )
         ct.raise_if_cancelled()
 
-        workbench_volume = volumes.enter_context(ephemeral_volume(docker))
+        workbench_volume = volumes.enter_context(
+            ephemeral_volume(docker, engine, test_reporter.overhead)
+        )
         ct.raise_if_cancelled()
 
         # We will run setup on the sandbox image, and then this will become the image with baked-in
         # cache and workbench volumes.
         image = sandbox
 
+        # Long-lived container running non-setup steps, if enabled.
+        container: Container | None = None
+        container_is_pristine = True
+
         is_setup_phase = True
         setup_failed = False
 
-        for step in test.steps:
+        # The step which ran last, and its exit code.
+        previous_step: str | None = None
+        # Steps whose state, as left when they succeeded, is saved in the exec container.
+        exec_snapshots: set[str] = set()
+        exit_code: int | None = None
+
+        def run_step(step: Step) -> int:
+            snapshot = artifacts.snapshot(step) if container is None else None
+            container_name = (
+                f"maat-{slugify(test.name)}-{slugify(step.name)}-{snowflake_id()}"
+            )
+            exit_code = step_reporter = clock = None
+            try:
+                with (
+                    step_slots if step_slots is not None else nullcontext(),
+                    track(f"{test.name}: `{step.name}`"),
+                    test_reporter.step(step) as step_reporter,
+                ):
+                    if container is not None:
+                        exit_code = docker_exec_step(
+                            docker=docker,
+                            container=container,
+                            command=split_command(step.run),
+                            ct=ct,
+                            step_reporter=step_reporter,
+                            env={**isolation_env, **step.env},
+                            workdir=step.workdir,
+                            timeout=step.timeout,
+                            stream_logs=step.timeout is not None
+                            or bool(os.environ.get("MAAT_STREAM_LOGS")),
+                        )
+                    else:
+                        clock = _StepClock()
+                        exit_code = docker_run_step(
+                            docker=docker,
+                            engine=engine,
+                            image=artifacts.image(step, default=image),
+                            command=split_command(step.run),
+                            container_name=container_name,
+                            cache_volume=cache_volume,
+                            workbench_volume=workbench_volume,
+                            ct=ct,
+                            step_reporter=step_reporter,
+                            env={**isolation_env, **step.env},
+                            workdir=step.workdir,
+                            # Only setup steps are allowed to populate the shared cache.
+                            extra_binds=[
+                                *step.binds,
+                                [
+                                    shared_cache_volume,
+                                    MAAT_SHARED_CACHE,
+                                    "rw" if step.setup else "ro",
+                                ],
+                            ],
+                            timeout=step.timeout,
+                            stream_logs=step.timeout is not None
+                            or bool(os.environ.get("MAAT_STREAM_LOGS")),
+                            worker=worker,
+                            clock=clock,
+                        )
+            finally:
+                if clock is not None:
+                    # Artifacts of failed steps are not worth reusing.
+                    _finish_step_container(
+                        docker,
+                        engine,
+                        container_name,
+                        clock,
+                        snapshot if exit_code == 0 else None,
+                        step_reporter,
+                    )
+            return exit_code
+
+        for index, step in enumerate(test.steps):
             ct.raise_if_cancelled()
 
             # Raise if a sudden setup step exists after a non-setup one.
@@ -130,74 +381,350 @@ def _execute_test(
                 is_setup_phase = False
 
                 with track(f"{test.name}: baking test image"):
-                    image = bake_volume(
+                    bake_start = time.perf_counter()
+                    image = bake_volumes(
                         docker=docker,
                         image=image,
-                        volume=cache_volume,
-                        mount=MAAT_CACHE,
+                        volumes=[
+                            (cache_volume, MAAT_CACHE),
+                            (workbench_volume, MAAT_WORKBENCH),
+                        ],
                         ct=ct,
+                        engine=engine,
                     )
-                    ct.raise_if_cancelled()
-
-                    image = bake_volume(
-                        docker=docker,
-                        image=image,
-                        volume=workbench_volume,
-                        mount=MAAT_WORKBENCH,
-                        ct=ct,
+                    test_reporter.overhead.bake = timedelta(
+                        seconds=time.perf_counter() - bake_start
                     )
+                    if baked is not None:
+                        # Removed after the exclusive timing phase.
+                        baked.append((test, image))
+                    else:
+                        # The baked image is useless once this test is done.
+                        images.callback(_remove_image, docker, image, engine)
                     ct.raise_if_cancelled()
 
                     # We don't need volumes any more, so we can delete them and stop mounting.
                     cache_volume, workbench_volume = None, None
                     volumes.close()
 
+                if exec_steps:
+                    with track(f"{test.name}: starting test container"):
+                        container = images.enter_context(
+                            _test_container(
+                                docker=docker,
+                                image=image,
+                                name=f"maat-{slugify(test.name)}-{snowflake_id()}",
+                                extra_binds=[
+                                    bind
+                                    for other in test.steps
+                                    if not other.setup
+                                    for bind in other.binds
+                                ],
+                                shared_cache_volume=shared_cache_volume,
+                                ct=ct,
+                                worker=worker,
+                            )
+                        )
+                        ct.raise_if_cancelled()
+
             assert is_setup_phase == step.setup, "setup phase transition messed up"
 
             ct.raise_if_cancelled()
 
-            with (
-                track(f"{test.name}: `{step.name}`"),
-                test_reporter.step(step) as step_reporter,
+            # Non-setup steps only depend on the baked image and on steps they declare they need,
+            # so the rest of the test can be run as a graph.
+            if step_slots is not None and container is None and not step.setup:
+                _run_step_graph(test, index, run_step)
+                break
+
+            # Each step must start from the same state, as if it got a fresh container, unless
+            # it reuses artifacts of a step, in which case it starts from that step's state.
+            if container is not None:
+                reuses_previous = (
+                    step.artifacts_from is not None
+                    and step.artifacts_from == previous_step
+                    and exit_code == 0
+                )
+                if reuses_previous:
+                    reset_from = None
+                elif step.artifacts_from in exec_snapshots:
+                    reset_from = _step_snapshot(step.artifacts_from)
+                elif not container_is_pristine:
+                    reset_from = MAAT_SNAPSHOT
+                else:
+                    reset_from = None
+                if reset_from is not None:
+                    docker.container.execute(
+                        container,
+                        ["bash", "-c", _reset_script(reset_from)],
+                        workdir="/",
+                    )
+                container_is_pristine = False
+
+            exit_code = run_step(step)
+            previous_step = step.name
+
+            # Save the state of a step whose artifacts are reused, like `_Artifacts` does with
+            # separate containers. This happens outside the step's timer.
+            if (
+                container is not None
+                and exit_code == 0
+                and any(other.artifacts_from == step.name for other in test.steps)
             ):
-                exit_code = docker_run_step(
-                    docker=docker,
-                    image=image,
-                    command=split_command(step.run),
-                    container_name=f"maat-{slugify(test.name)}-{slugify(step.name)}-{snowflake_id()}",
-                    cache_volume=cache_volume,
-                    workbench_volume=workbench_volume,
-                    ct=ct,
-                    step_reporter=step_reporter,
-                    env=step.env,
-                    workdir=step.workdir,
-                    extra_binds=step.binds or None,
-                    timeout=step.timeout,
-                    stream_logs=step.timeout is not None
-                    or bool(os.environ.get("MAAT_STREAM_LOGS")),
+                docker.container.execute(
+                    container,
+                    ["bash", "-c", _snapshot_script(_step_snapshot(step.name))],
+                    workdir="/",
                 )
+                exec_snapshots.add(step.name)
 
-                # If this was a setup step, and it failed, mark that we should skip the remaining steps.
-                if step.setup and exit_code != 0:
-                    setup_failed = True
+            # If this was a setup step, and it failed, mark that we should skip the remaining steps.
+            if step.setup and exit_code != 0:
+                setup_failed = True
+
+
+def _run_step_graph(test: Test, start: int, run: Callable[[Step], int]):
+    """
+    Run each non-setup step of a test, from the given index on, as soon as all steps it needs
+    have finished.
+
+    Steps which do not declare what they need wait for all steps preceding them.
+    A failed step does not prevent steps which need it from running, just like in sequential
+    execution.
+    """
+    steps = test.steps[start:]
+    preceding: list[str] = []
+    needs: dict[str, list[str]] = {}
+    for index, step in enumerate(test.steps):
+        if index >= start:
+            if step.setup:
+                raise RuntimeError(
+                    f"Setup step `{step.name}` found after non-setup step in test: {test.name}"
+                )
+            if unknown := set(step.needs or []) - set(preceding):
+                raise RuntimeError(
+                    f"Step `{step.name}` needs steps which do not precede it in test "
+                    f"{test.name}: {', '.join(sorted(unknown))}"
+                )
+            needs[step.name] = preceding.copy() if step.needs is None else step.needs
+            if step.artifacts_from is not None:
+                if step.artifacts_from not in preceding:
+                    raise RuntimeError(
+                        f"Step `{step.name}` reuses artifacts of a step which does not precede "
+                        f"it in test {test.name}: {step.artifacts_from}"
+                    )
+                needs[step.name] = [*needs[step.name], step.artifacts_from]
+        preceding.append(step.name)
+
+    finished = {step.name: threading.Event() for step in steps}
+
+    def run_when_ready(step: Step):
+        try:
+            for name in needs[step.name]:
+                # Steps which are not part of the graph have already finished.
+                if name in finished:
+                    finished[name].wait()
+            run(step)
+        finally:
+            finished[step.name].set()
+
+    # Every step gets its own thread, so that waiting steps cannot starve the ones they need.
+    with ThreadPoolExecutor(max_workers=len(steps)) as pool:
+        futures = [pool.submit(run_when_ready, step) for step in steps]
+
+    for future in futures:
+        future.result()
+
+
+def _measure_exclusively(
+    test: Test,
+    image: Image | str,
+    shared_cache_volume: Volume | str,
+    ct: CancellationToken,
+    docker: DockerClient,
+    engine: DockerEngine | None,
+    reporter: Reporter,
+):
+    """Re-run timing-relevant steps of a finished test in its baked image."""
+    with _Artifacts(test, docker, engine) as artifacts:
+        for step in test.steps:
+            if step.name not in TIMING_STEPS:
+                continue
+
+            ct.raise_if_cancelled()
+
+            snapshot = artifacts.snapshot(step)
+            container_name = (
+                f"maat-{slugify(test.name)}-{slugify(step.name)}-{snowflake_id()}"
+            )
+            exit_code = step_reporter = None
+            clock = _StepClock()
+            try:
+                with (
+                    track(f"{test.name}: `{step.name}` (exclusive)"),
+                    reporter.exclusive_step(test, step) as step_reporter,
+                ):
+                    exit_code = docker_run_step(
+                        docker=docker,
+                        engine=engine,
+                        image=artifacts.image(step, default=image),
+                        command=split_command(step.run),
+                        container_name=container_name,
+                        ct=ct,
+                        step_reporter=step_reporter,
+                        env=step.env,
+                        workdir=step.workdir,
+                        extra_binds=[
+                            *step.binds,
+                            [shared_cache_volume, MAAT_SHARED_CACHE, "ro"],
+                        ],
+                        timeout=step.timeout,
+                        clock=clock,
+                    )
+            finally:
+                _finish_step_container(
+                    docker,
+                    engine,
+                    container_name,
+                    clock,
+                    snapshot if exit_code == 0 else None,
+                    step_reporter,
+                )
+
+
+class _Artifacts:
+    """
+    Snapshots of step containers, from which steps reusing their artifacts start.
+
+    See ``Step.artifacts_from``.
+    """
+
+    def __init__(
+        self, test: Test, docker: DockerClient, engine: DockerEngine | None = None
+    ):
+        self._docker = docker
+        self._engine = engine
+        self._producers = {step.artifacts_from for step in test.steps}
+        self._images: dict[str, Image | str] = {}
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        for image in self._images.values():
+            _remove_image(self._docker, image, self._engine)
+        return False  # Don't suppress exceptions.
+
+    def snapshot(self, step: Step) -> Callable[[str], None] | None:
+        """Callback snapshotting the container of the given step, if any step reuses it."""
+        if step.name not in self._producers:
+            return None
+
+        def take(container_name: str):
+            if self._engine is not None:
+                image = self._engine.commit(container_name)
+            else:
+                image = self._docker.container.commit(container_name)
+            self._images[step.name] = image
+
+        return take
+
+    def image(self, step: Step, default: Image | str) -> Image | str:
+        """Image to run the given step in."""
+        if step.artifacts_from is None:
+            return default
+        return self._images.get(step.artifacts_from, default)
+
+
+def _snapshot_script(target: str) -> str:
+    """Save cache and workbench of an exec container into the given directory."""
+    return (
+        f"rm -rf '{target}' && mkdir -p '{target}' && "
+        f"cp -a '{MAAT_CACHE}' '{target}/cache' && "
+        f"cp -a '{MAAT_WORKBENCH}' '{target}/workbench'"
+    )
+
+
+def _reset_script(source: str) -> str:
+    """Restore cache and workbench of an exec container from the given snapshot directory."""
+    return (
+        f"rm -rf '{MAAT_CACHE}' '{MAAT_WORKBENCH}' && "
+        f"cp -a '{source}/cache' '{MAAT_CACHE}' && "
+        f"cp -a '{source}/workbench' '{MAAT_WORKBENCH}'"
+    )
+
+
+def _step_snapshot(step_name: str) -> str:
+    """Snapshot directory of the state a step left in an exec container."""
+    return f"{MAAT_SNAPSHOT}-steps/{slugify(step_name)}"
+
+
+@contextmanager
+def _test_container(
+    docker: DockerClient,
+    image: Image | str,
+    name: str,
+    extra_binds: list[list[str | Volume]],
+    shared_cache_volume: Volume | str,
+    ct: CancellationToken,
+    worker: WorkerIsolation | None = None,
+) -> Iterator[Container]:
+    """
+    Start a long-lived container for running steps with docker exec.
+
+    Initial state of cache and workbench is snapshotted, so it can be restored between steps.
+    """
+    container = docker.container.run(
+        image=image,
+        command=["sleep", "infinity"],
+        name=name,
+        labels=ct.container_labels,
+        volumes=[
+            *extra_binds,
+            (shared_cache_volume, MAAT_SHARED_CACHE, "ro"),
+        ],
+        detach=True,
+        init=True,
+        **_limits(worker),
+    )
+    try:
+        docker.container.execute(
+            container, ["bash", "-c", _snapshot_script(MAAT_SNAPSHOT)], workdir="/"
+        )
+        yield container
+    finally:
+        try:
+            container.remove(force=True)
+        except DockerException as e:
+            log(f"⚠️ Failed to remove container {name}: {e}")
 
 
 def docker_run_step(
     docker: DockerClient,
     image: Image | str,
     command: list[str],
-    cache_volume: Volume | None = None,
-    workbench_volume: Volume | None = None,
+    cache_volume: Volume | str | None = None,
+    workbench_volume: Volume | str | None = None,
     container_name: str | None = None,
     ct: CancellationToken | None = None,
     step_reporter: StepReporter | None = None,
     raise_on_nonzero_exit: bool = False,
     env: dict[str, str] | None = None,
     workdir: str | None = None,
-    extra_binds: list[list[str]] | None = None,
+    extra_binds: list[list[str | Volume]] | None = None,
     timeout: float | None = None,
     stream_logs: bool = False,
+    engine: DockerEngine | None = None,
+    worker: WorkerIsolation | None = None,
+    clock: "_StepClock | None" = None,
 ) -> int:
+    """
+    Run a step in a new container.
+
+    With ``clock``, the container is kept, so that the caller can inspect, snapshot and remove it
+    with ``_finish_step_container`` once the step's timer has stopped. Otherwise, it is removed
+    right away.
+    """
     exit_code = 0
 
     if container_name is None:
@@ -207,15 +734,6 @@ def docker_run_step(
     if ct is not None:
         labels.update(ct.container_labels)
 
-    real_workdir: str
-    if isinstance(workdir, str):
-        if Path(workdir).is_absolute():
-            real_workdir = workdir
-        else:
-            real_workdir = str(Path(MAAT_WORKBENCH) / workdir)
-    else:
-        real_workdir = MAAT_WORKBENCH
-
     volumes = []
     if cache_volume is not None:
         volumes.append((cache_volume, MAAT_CACHE, "rw"))
@@ -224,104 +742,426 @@ def docker_run_step(
     if extra_binds:
         volumes.extend(extra_binds)
 
+    # Docker writes the container ID here, so its cgroup can be sampled while it runs.
+    cidfile = Path(tempfile.gettempdir()) / f"{container_name}.cid"
+    sampler = CgroupSampler(cidfile=None if engine is not None else cidfile)
+    keep_container = clock is not None
+    if clock is None:
+        clock = _StepClock()
+
+    try:
+        if engine is not None:
+            events = engine.run(
+                image=image_id(image),
+                command=command,
+                name=container_name,
+                env=env,
+                workdir=_real_workdir(workdir),
+                binds=[bind(volume) for volume in volumes],
+                labels=labels,
+                cpuset_cpus=worker and worker.cpuset,
+                memory_mb=worker and worker.memory_mb,
+            )
+            kill = lambda: engine.kill(container_name)
+        else:
+            stream = docker.container.run(
+                image=image,
+                command=command,
+                envs=env or {},
+                name=container_name,
+                labels=labels,
+                # Removed by us, possibly once inspected, see `_finish_step_container`.
+                remove=False,
+                volumes=volumes,
+                workdir=_real_workdir(workdir),
+                cidfile=cidfile,
+                stream=True,
+                **_limits(worker),
+            )
+            events = _pump(stream, container_name)
+            kill = lambda: docker.container.kill(container_name)
+
+        if _consume_events(
+            events,
+            container_name=container_name,
+            ct=ct,
+            step_reporter=step_reporter,
+            timeout=timeout,
+            stream_logs=stream_logs,
+            kill=kill,
+            sampler=sampler,
+            clock=clock,
+        ):
+            exit_code = EXIT_STEP_TIMEOUT
+    except DockerException as e:
+        exit_code = e.return_code
+        if raise_on_nonzero_exit:
+            raise
+        # Docker run uses exit codes 125, 126, 127 to signal Docker daemon errors.
+        # Anything other than these values comes from the container process.
+        # Ref: https://docs.docker.com/engine/containers/run/#exit-status
+        elif exit_code in [125, 126, 127]:
+            raise
+    finally:
+        # Last chance to read counters before the container and its cgroup are removed.
+        sampler.sample(final=True)
+        cidfile.unlink(missing_ok=True)
+        if not keep_container:
+            _remove_container(docker, engine, container_name)
+        if step_reporter is not None:
+            step_reporter.set_exit_code(exit_code)
+            step_reporter.set_resources(sampler.summary())
+
+    return exit_code
+
+
+def _limits(worker: WorkerIsolation | None) -> dict[str, list[int] | str]:
+    """Resource limits of a container run by the given worker, as ``docker run`` arguments."""
+    if worker is None:
+        return {}
+    # python_on_whales joins the CPUs itself, so they must be passed as a list, not as `cpuset`.
+    limits: dict[str, list[int] | str] = {"cpuset_cpus": worker.cpus}
+    if worker.memory_mb is not None:
+        limits["memory"] = f"{worker.memory_mb}m"
+    return limits
+
+
+def _now() -> datetime:
+    return datetime.now(UTC)
+
+
+@dataclass
+class _StepClock:
+    """Harness-side timestamps of a step container's lifecycle."""
+
+    requested_at: datetime = field(default_factory=_now)
+    first_output_at: datetime | None = None
+
+
+def _remove_step_container(
+    docker: DockerClient,
+    engine: DockerEngine | None,
+    container_name: str,
+    clock: _StepClock,
+    remove: bool = True,
+) -> StepOverhead | None:
+    """
+    Remove a step's container, and break its lifetime down into phases.
+
+    Without ``remove``, the container is only inspected, and its teardown is not reported.
+
+    Returns ``None`` if the container cannot be inspected, e.g., because it has never been
+    created.
+    """
+    try:
+        if engine is not None:
+            info = engine.inspect(container_name)
+            created_at = _docker_time(info["Created"])
+            started_at = _docker_time(info["State"]["StartedAt"])
+            finished_at = _docker_time(info["State"]["FinishedAt"])
+        else:
+            container = docker.container.inspect(container_name)
+            created_at = _docker_time(container.created)
+            started_at = _docker_time(container.state.started_at)
+            finished_at = _docker_time(container.state.finished_at)
+    except DockerException:
+        # The container may still exist, e.g., if inspecting it timed out, so remove it anyway.
+        if remove:
+            _remove_container(docker, engine, container_name)
+        return None
+
+    removed_at = None
+    if remove:
+        _remove_container(docker, engine, container_name)
+        removed_at = _now()
+
+    return StepOverhead(
+        create=_phase(clock.requested_at, created_at),
+        start=_phase(created_at, started_at),
+        first_output=_phase(started_at, clock.first_output_at),
+        run=_phase(started_at, finished_at),
+        teardown=_phase(finished_at, removed_at),
+    )
+
+
+def _remove_container(
+    docker: DockerClient, engine: DockerEngine | None, container_name: str
+):
     try:
-        stream = docker.container.run(
-            image=image,
-            command=command,
+        if engine is not None:
+            engine.remove_container(container_name)
+        else:
+            docker.container.remove(container_name, force=True)
+    except NoSuchContainer:
+        return
+    except DockerException as e:
+        log(f"⚠️ Failed to remove container {container_name}: {e}")
+
+
+def _finish_step_container(
+    docker: DockerClient,
+    engine: DockerEngine | None,
+    container_name: str,
+    clock: _StepClock,
+    snapshot: Callable[[str], None] | None,
+    step_reporter: StepReporter | None,
+):
+    """
+    Inspect, snapshot if requested, and remove a container kept by ``docker_run_step``.
+
+    Call this once the step's reporter has exited, so that these Docker calls do not count towards
+    the step's execution time. They are recorded in the step's overhead instead.
+    """
+    overhead = _remove_step_container(
+        docker, engine, container_name, clock, remove=snapshot is None
+    )
+    if snapshot is not None:
+        start = time.perf_counter()
+        try:
+            snapshot(container_name)
+        except DockerException as e:
+            log(f"⚠️ Failed to snapshot container {container_name}: {e}")
+        if overhead is not None:
+            overhead.snapshot = timedelta(seconds=time.perf_counter() - start)
+        _remove_container(docker, engine, container_name)
+    if step_reporter is not None:
+        step_reporter.set_overhead(overhead)
+
+
+def _docker_time(value: datetime | str | None) -> datetime | None:
+    """Parse a timestamp reported by Docker, which uses year 1 for events that did not happen."""
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    if value is None or value.year <= 1:
+        return None
+    return value
+
+
+def _phase(start: datetime | None, end: datetime | None) -> timedelta | None:
+    if start is None or end is None:
+        return None
+    # Docker's and our clocks may be slightly off, so never report negative durations.
+    return max(end - start, timedelta())
+
+
+def docker_exec_step(
+    docker: DockerClient,
+    container: Container,
+    command: list[str],
+    ct: CancellationToken | None = None,
+    step_reporter: StepReporter | None = None,
+    env: dict[str, str] | None = None,
+    workdir: str | None = None,
+    timeout: float | None = None,
+    stream_logs: bool = False,
+) -> int:
+    """
+    Same as `docker_run_step`, but runs the command in an already running container.
+    """
+    exit_code = 0
+
+    if timeout is not None:
+        # Kill only the step's process, so the container stays usable for the next steps.
+        # `timeout` exits with `EXIT_STEP_TIMEOUT` just like the harness does.
+        command = [
+            "timeout",
+            f"--kill-after={EXEC_KILL_GRACE_SECS}",
+            str(timeout),
+            *command,
+        ]
+        # The harness-side timeout is now just a backstop that kills the whole container.
+        timeout += 2 * EXEC_KILL_GRACE_SECS
+
+    try:
+        stream = docker.container.execute(
+            container,
+            command,
             envs=env or {},
-            name=container_name,
-            labels=labels,
-            remove=True,
-            volumes=volumes,
-            workdir=real_workdir,
+            workdir=_real_workdir(workdir),
             stream=True,
         )
 
-        # Consume the container's output on a helper thread so we can enforce a wall-clock
-        # timeout on it. A plain `for ... in stream` is an unbounded blocking read: a hung
-        # container (e.g. a wedged CairoLS during the `ls` step) would otherwise block this
-        # worker thread — and therefore `pool.shutdown(wait=True)` and the whole partition —
-        # until the CI job's 6h ceiling, with no output flushed.
-        events: Queue = Queue()
+        if _consume_events(
+            _pump(stream, container.name),
+            container_name=container.name,
+            ct=ct,
+            step_reporter=step_reporter,
+            timeout=timeout,
+            stream_logs=stream_logs,
+            kill=lambda: docker.container.kill(container),
+        ):
+            exit_code = EXIT_STEP_TIMEOUT
+    except DockerException as e:
+        exit_code = e.return_code
+        # Docker exec uses exit codes 126, 127 to signal that the command could not be run.
+        if exit_code in [126, 127]:
+            raise
+    finally:
+        if step_reporter is not None:
+            step_reporter.set_exit_code(exit_code)
 
-        def _pump():
-            try:
-                for source, line in stream:
-                    events.put(("line", source, line))
-                events.put(("done", None, None))
-            except DockerException as exc:
-                events.put(("docker_error", exc, None))
-            except Exception as exc:  # forward any other error to the main thread
-                events.put(("error", exc, None))
-
-        pump_thread = threading.Thread(
-            target=_pump, name=f"maat-pump-{container_name}", daemon=True
-        )
-        pump_thread.start()
+    return exit_code
+
+
+def _pump(stream: Iterable[tuple[str, bytes]], container_name: str) -> Queue:
+    """
+    Consume container output on a helper thread, forwarding it as events to the returned queue.
+    """
+
+    # Consume the container's output on a helper thread so we can enforce a wall-clock
+    # timeout on it. A plain `for ... in stream` is an unbounded blocking read: a hung
+    # container (e.g. a wedged CairoLS during the `ls` step) would otherwise block this
+    # worker thread — and therefore `pool.shutdown(wait=True)` and the whole partition —
+    # until the CI job's 6h ceiling, with no output flushed.
+    events: Queue = Queue()
+
+    def _pump_main():
+        try:
+            for source, line in stream:
+                events.put(("line", source, line))
+            events.put(("done", None, None))
+        except DockerException as exc:
+            events.put(("docker_error", exc, None))
+        except Exception as exc:  # forward any other error to the main thread
+            events.put(("error", exc, None))
+
+    threading.Thread(
+        target=_pump_main, name=f"maat-pump-{container_name}", daemon=True
+    ).start()
+
+    return events
 
-        deadline = None if timeout is None else time.monotonic() + timeout
-        timed_out = False
-        pending_error: Exception | None = None
 
-        while True:
-            if ct is not None and ct.is_cancelled:
-                # Cancellation kills containers by label elsewhere; stop consuming output.
+def _consume_events(
+    events: Queue,
+    container_name: str,
+    ct: CancellationToken | None,
+    step_reporter: StepReporter | None,
+    timeout: float | None,
+    stream_logs: bool,
+    kill: Callable[[], None],
+    sampler: CgroupSampler | None = None,
+    clock: _StepClock | None = None,
+) -> bool:
+    """
+    Consume container output events, feeding lines to the step reporter.
+
+    Events are ``("line", source, line)`` tuples, terminated by one of ``("done", None, None)``,
+    ``("docker_error", DockerException, None)`` or ``("error", Exception, None)``. A
+    ``("created", container_id, None)`` event may come first.
+
+    If ``sampler`` is given, it samples the container's resource usage while consuming, and once
+    more when the output ends.
+    If ``clock`` is given, the time of the first output line is recorded in it.
+
+    Returns whether the timeout has been exceeded, in which case ``kill`` has been called.
+    """
+
+    deadline = None if timeout is None else time.monotonic() + timeout
+    timed_out = False
+    pending_error: Exception | None = None
+
+    def _handle_line(source: str, line: bytes):
+        if clock is not None and clock.first_output_at is None:
+            clock.first_output_at = _now()
+        if step_reporter is not None:
+            step_reporter.log(source, line)
+        if stream_logs:
+            _tee_line(source, line)
+
+    while True:
+        if ct is not None and ct.is_cancelled:
+            # Cancellation kills containers by label elsewhere; stop consuming output.
+            break
+
+        if sampler is not None:
+            sampler.sample()
+
+        # Wake up regularly, so that the sampler keeps up even if there is no output.
+        max_wait = SAMPLE_INTERVAL_SECS if sampler is not None else 1.0
+        if deadline is None:
+            wait = max_wait
+        else:
+            wait = deadline - time.monotonic()
+            if wait <= 0:
+                timed_out = True
                 break
+            wait = min(wait, max_wait)
 
-            if deadline is None:
-                wait = 1.0
-            else:
-                wait = deadline - time.monotonic()
-                if wait <= 0:
-                    timed_out = True
-                    break
-                wait = min(wait, 1.0)
+        try:
+            kind, a, b = events.get(timeout=wait)
+        except Empty:
+            continue
+
+        if kind == "line":
+            _handle_line(a, b)
+        elif kind == "created":
+            if sampler is not None:
+                sampler.attach(a)
+        elif kind == "done":
+            break
+        else:  # "docker_error" or "error"
+            pending_error = a
+            break
+
+    # The process has exited (or is being killed), but its cgroup may still be there.
+    if sampler is not None:
+        sampler.sample(final=True)
 
+    if timed_out:
+        log(
+            f"⏱️ step exceeded timeout of {timeout:.0f}s, "
+            f"killing container {container_name}"
+        )
+        try:
+            kill()
+        except DockerException:
+            pass  # already gone / not running
+        # Give the container a moment to flush the tail so the report captures it.
+        drain_deadline = time.monotonic() + 30
+        while (wait := drain_deadline - time.monotonic()) > 0:
             try:
                 kind, a, b = events.get(timeout=wait)
             except Empty:
-                continue
-
-            if kind == "line":
-                source, line = a, b
-                if step_reporter is not None:
-                    step_reporter.log(source, line)
-                if stream_logs:
-                    _tee_line(source, line)
-            elif kind == "done":
                 break
-            else:  # "docker_error" or "error"
-                pending_error = a
+            if kind != "line":
                 break
+            _handle_line(a, b)
+    elif pending_error is not None:
+        raise pending_error
 
-        if timed_out:
-            log(
-                f"⏱️ step exceeded timeout of {timeout:.0f}s, "
-                f"killing container {container_name}"
-            )
-            try:
-                docker.container.kill(container_name)
-            except DockerException:
-                pass  # already gone / not running
-            exit_code = EXIT_STEP_TIMEOUT
-            # Give the pump a moment to drain the tail so the report captures it.
-            pump_thread.join(timeout=30)
-        elif pending_error is not None:
-            raise pending_error
+    return timed_out
+
+
+def _real_workdir(workdir: str | None) -> str:
+    if isinstance(workdir, str):
+        if Path(workdir).is_absolute():
+            return workdir
+        else:
+            return str(Path(MAAT_WORKBENCH) / workdir)
+    else:
+        return MAAT_WORKBENCH
+
+
+def _remove_image(
+    docker: DockerClient, image: Image | str, engine: DockerEngine | None = None
+):
+    try:
+        if engine is not None:
+            engine.remove_image(image_id(image))
+        else:
+            docker.image.remove(image, force=True)
     except DockerException as e:
-        exit_code = e.return_code
-        if raise_on_nonzero_exit:
-            raise
-        # Docker run uses exit codes 125, 126, 127 to signal Docker daemon errors.
-        # Anything other than these values comes from the container process.
-        # Ref: https://docs.docker.com/engine/containers/run/#exit-status
-        elif exit_code in [125, 126, 127]:
-            raise
-    finally:
-        if step_reporter is not None:
-            step_reporter.set_exit_code(exit_code)
+        log(f"⚠️ Failed to remove image {image_id(image)}: {e}")
 
-    return exit_code
+
+def _remove_images(
+    docker: DockerClient,
+    baked: list[tuple[Test, Image | str]],
+    engine: DockerEngine | None = None,
+):
+    for _, image in baked:
+        _remove_image(docker, image, engine)
 
 
 def _tee_line(source: str, line: bytes) -> None:
@@ -342,12 +1182,15 @@ def truncate_with_ellipsis(text, max_length):
     return text[: max_length - 1] + "…"
 
 
-def determine_jobs_amount(jobs: int | None) -> int:
+def determine_jobs_amount(jobs: int | None, admission: Admission) -> int:
     if jobs is not None:
         return jobs
 
     if num := os.cpu_count():
         # Too much parallelism results in aggressive RAM consumption and severely degraded perf.
+        # Admission control keeps resources in check, so the cap is only needed without it.
+        if admission.enabled:
+            return num
         return min(num, 4)
 
     return 1
@@ -0,0 +1,77 @@
+import os
+from collections.abc import Iterator
+from contextlib import contextmanager
+from queue import Queue
+
+from maat.hardware import WorkerIsolation, memory_available_kb
+from maat.runner.admission import MEMORY_HEADROOM_KB
+from maat.utils.log import log
+
+
+class WorkerPool:
+    """
+    Splits host CPUs and memory into equal, disjoint shares, one for each executor worker.
+
+    A test holds a share for its whole execution, so its steps never compete for cores with steps
+    of tests running alongside. CPUs are those this process may run on, and memory is the memory
+    available when the pool is created, minus the headroom kept for the rest of the host.
+    """
+
+    def __init__(self, jobs: int):
+        cpus = _usable_cpus()
+        if jobs > len(cpus):
+            log(
+                f"⚠️ Isolation mode supports at most one job per CPU, running {len(cpus)} jobs"
+            )
+            jobs = len(cpus)
+
+        available = memory_available_kb()
+        memory_mb = (
+            None
+            if available is None
+            else max(available - MEMORY_HEADROOM_KB, 0) // jobs // 1024
+        )
+
+        # Spread leftover CPUs over the first workers, so that all CPUs are used.
+        share, extra = divmod(len(cpus), jobs)
+        self.workers: list[WorkerIsolation] = []
+        start = 0
+        for i in range(jobs):
+            end = start + share + (1 if i < extra else 0)
+            self.workers.append(
+                WorkerIsolation(cpus=cpus[start:end], memory_mb=memory_mb)
+            )
+            start = end
+
+        self._free: Queue[WorkerIsolation] = Queue()
+        for worker in self.workers:
+            self._free.put(worker)
+
+    @contextmanager
+    def acquire(self) -> Iterator[WorkerIsolation]:
+        worker = self._free.get()
+        try:
+            yield worker
+        finally:
+            self._free.put(worker)
+
+
+def _usable_cpus() -> list[int]:
+    # Not available on macOS, where containers run in a VM anyway.
+    if hasattr(os, "sched_getaffinity"):
+        return sorted(os.sched_getaffinity(0))
+    return list(range(os.cpu_count() or 1))
+
+
+def thread_env(worker: WorkerIsolation) -> dict[str, str]:
+    """Environment variables limiting tools' parallelism to the CPUs of the given worker."""
+    threads = str(len(worker.cpus))
+    return {
+        # Scarb and the Cairo compiler.
+        "SCARB_NUM_JOBS": threads,
+        # Cargo, used by procedural macros and `cargo test` runners.
+        "CARGO_BUILD_JOBS": threads,
+        # Thread pools of Rust tools, notably Starknet Foundry.
+        "RAYON_NUM_THREADS": threads,
+        "TOKIO_WORKER_THREADS": threads,
+    }
@@ -1,16 +1,21 @@
-from dataclasses import dataclass
-import shlex
 import os
+import shlex
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
 
-from maat.utils.log import track
+import requests
 from python_on_whales import DockerClient, Image
 
 from maat.ecosystem.spec import EcosystemProject, ReportNameGenerationContext
 from maat.ecosystem.utils import flatten_ecosystem
-from maat.model import Plan, Step, Test, TestSuite
+from maat.model import Plan, SkippedProject, Step, Test, TestSuite
+from maat.report.history import History
 from maat.sandbox import tool_versions
 from maat.utils.docker import image_id
+from maat.utils.http import HTTP_POOL_SIZE
+from maat.utils.log import log, track
 from maat.utils.semver import is_unstable_semver
+from maat.utils.unique_id import snowflake_id
 from maat.workspace import Workspace
 
 # Wall-clock cap for the `ls` step's container. CairoLS can freeze on heavy proc-macro projects
@@ -19,8 +24,51 @@ from maat.workspace import Workspace
 # value only has to comfortably exceed that so the harness gets a chance to self-report first.
 LS_STEP_TIMEOUT_SECS = 30 * 60
 
+TIMING_STEPS = {
+    "build",
+    "incremental-build",
+    "edit-build",
+    "incremental-build-no-test",
+    "lint",
+    "test",
+}
+"""
+Steps whose timings are compared across experiments. These are repeated in benchmark mode, and
+re-run in the exclusive timing phase (see ``execute_plan_partition``).
+"""
+
+
+@dataclass(frozen=True)
+class Benchmark:
+    """
+    Repeated-measurement settings: benchmarked steps run ``warmup`` times unmeasured and then
+    ``runs`` times measured, each time starting from the same state of the target directory.
+    """
+
+    warmup: int
+    runs: int
+
+    def wrap(self, command: str) -> str:
+        return f"maat-bench {self.warmup} {self.runs} {command}"
+
+
+WORKFLOW_VERSION = 2
+"""
+Version of the step workflow, bumped whenever a change makes step timings incomparable with
+older reports. Version 2 times ``build`` inside a bash wrapper, with artifact fingerprinting
+disabled.
+"""
 
-def _workflow(project: EcosystemProject, scarb: str) -> list[Step]:
+EDIT_SCENARIOS = ["touch-leaf", "add-fn", "edit-fn", "add-test"]
+"""Source edits applied one after another by the ``edit-build`` step, see ``maat-edit-build``."""
+
+
+def _workflow(
+    project: EcosystemProject,
+    scarb: str,
+    benchmark: Benchmark | None = None,
+    reuse_artifacts: bool = False,
+) -> list[Step]:
     env: dict[str, str] = {}
 
     # We need to disable cairo-version checks for unstable versions, as otherwise scarb would reject
@@ -32,42 +80,70 @@ def _workflow(project: EcosystemProject, scarb: str) -> list[Step]:
 
     incremental_build_env = {**env, "SCARB_ARTIFACTS_FINGERPRINT": "false"}
 
-    return [
+    steps = [
         Step(run="maat-check-versions", setup=True, workdir=project.workdir),
         Step(run="maat-patch", setup=True, workdir=project.workdir),
         Step(
             name="fetch",
-            run="scarb fetch",
+            run="maat-shared-cache scarb fetch",
             setup=True,
             checkout=False,
             workdir=project.workdir,
         ),
+        # Regular steps start from the baked image, so apart from incremental builds, which
+        # start from the result of `build`, none of them needs another to run. Still, with
+        # --parallel-steps, run the rest after `build`, so that a project's builds do not all
+        # compete for CPU at once, and keep incremental builds one after another.
+        #
         # Show what dependencies were resolved in logs.
         # This is just for debugging purposes, so it doesn't make sense for it to be a setup step.
-        Step(name="tree", run="scarb tree -q --workspace", workdir=project.workdir),
+        Step(
+            name="tree",
+            run="scarb tree -q --workspace",
+            workdir=project.workdir,
+            needs=[],
+        ),
+        # This build is cold, so it also provides the cold timing for `incremental-build`.
         Step(
             name="build",
-            run="scarb build --workspace --test",
+            run=_timed_command("scarb build --workspace --test", "MAAT_COLD_BUILD_NS"),
             workdir=project.workdir,
-            env=env,
+            env=incremental_build_env,
+            needs=[],
         ),
         Step(
             name="incremental-build",
-            run=_incremental_build_command("scarb build --workspace --test"),
+            run=_timed_command("scarb build --workspace --test", "MAAT_INCR_BUILD_NS"),
+            workdir=project.workdir,
+            env=incremental_build_env,
+            needs=["build"],
+            artifacts_from="build",
+        ),
+        # Rebuilds after typical source edits, starting from the result of `build` as well.
+        Step(
+            name="edit-build",
+            run=f"maat-edit-build {' '.join(EDIT_SCENARIOS)} -- scarb build --workspace --test",
             workdir=project.workdir,
             env=incremental_build_env,
+            needs=["incremental-build"],
+            artifacts_from="build",
         ),
+        # Building with tests builds the library targets too, so this one starts from the result
+        # of `build` as well.
         Step(
             name="incremental-build-no-test",
-            run=_incremental_build_command("scarb build --workspace"),
+            run=_timed_command("scarb build --workspace", "MAAT_INCR_BUILD_NS"),
             workdir=project.workdir,
             env=incremental_build_env,
+            needs=["edit-build"],
+            artifacts_from="build",
         ),
         Step(
             name="lint",
             run="scarb lint --workspace --deny-warnings",
             workdir=project.workdir,
             env=env,
+            needs=["build"],
         ),
         Step(
             name="test",
@@ -78,6 +154,7 @@ def _workflow(project: EcosystemProject, scarb: str) -> list[Step]:
                 "SNFORGE_IGNORE_FORK_TESTS": "1",
             },
             workdir=project.workdir,
+            needs=["build"],
         ),
         Step(
             name="ls",
@@ -85,9 +162,24 @@ def _workflow(project: EcosystemProject, scarb: str) -> list[Step]:
             workdir=project.workdir,
             env=env,
             timeout=LS_STEP_TIMEOUT_SECS,
+            needs=["build"],
         ),
     ]
 
+    if benchmark is not None:
+        for step in steps:
+            if step.name in TIMING_STEPS:
+                step.run = benchmark.wrap(step.run)
+
+    # Artifacts are only reused if consumers see the same fingerprinting setting as `build`.
+    if reuse_artifacts:
+        for step in steps:
+            if step.name in ("lint", "test", "ls"):
+                step.artifacts_from = "build"
+                step.env = {**step.env, "SCARB_ARTIFACTS_FINGERPRINT": "false"}
+
+    return steps
+
 
 def inject_local_ls_binary(
     tests: list[Test], host_path: str, scarb_version: str
@@ -113,18 +205,41 @@ def prepare_plan(
     docker: DockerClient,
     report_name: str | None = None,
     extra_env: str | None = None,
+    history: History | None = None,
+    benchmark: Benchmark | None = None,
+    reuse_artifacts: bool = False,
 ) -> Plan:
     scarb, foundry = tool_versions(sandbox, docker)
 
+    if history is None:
+        history = History()
+
     with track("Collecting ecosystem"):
+        projects = list(flatten_ecosystem(workspace.settings.ecosystem))
+        revs, skipped = _fetch_revs(projects)
+
         tests = []
-        for project in flatten_ecosystem(workspace.settings.ecosystem):
-            steps = project.setup() + _workflow(project=project, scarb=scarb)
+        for project, rev in zip(projects, revs, strict=True):
+            if rev is None:
+                continue
+
+            steps = project.setup() + _workflow(
+                project=project,
+                scarb=scarb,
+                benchmark=benchmark,
+                reuse_artifacts=reuse_artifacts,
+            )
+
+            # Prefer history over the hand-set flag, which only matters for never-run projects.
+            heavy = history.is_heavy(project.name)
+            if heavy is None:
+                heavy = project.heavy
+
             test = Test(
                 name=project.name,
-                rev=project.fetch_rev(),
+                rev=rev,
                 steps=steps,
-                heavy=project.heavy,
+                heavy=heavy,
             )
             tests.append(test)
 
@@ -154,15 +269,18 @@ def prepare_plan(
             )
         )
 
-    partitioned_suite = suite.partition(partitions)
+    partitioned_suite = suite.partition(partitions, cost=history.predict_duration)
 
     return Plan(
+        id=str(snowflake_id()),
         workspace=workspace.name,
+        workflow=WORKFLOW_VERSION,
         scarb=scarb,
         foundry=foundry,
         report_name=report_name,
         sandbox=image_id(sandbox),
         partitions=partitioned_suite,
+        skipped=skipped,
     )
 
 
@@ -174,26 +292,53 @@ class _PlanningReportNameGenerationContext(ReportNameGenerationContext):
     run_id: str
 
 
-def _incremental_build_command(build_cmd: str) -> str:
-    """Build a bash one-liner that runs *build_cmd* twice.
-
-    The first run is treated as cold and its duration is emitted as
-    ``MAAT_COLD_BUILD_NS``. The second run reuses the target directory
-    (incremental compilation) and its duration is emitted as
-    ``MAAT_INCR_BUILD_NS`` so the analysis phase can parse both values.
-    """
+def _timed_command(cmd: str, marker: str) -> str:
+    """Build a bash one-liner that runs *cmd* and emits its duration as *marker*."""
     return (
         "bash -c '"
-        f"START_COLD=$(date +%s%N); {build_cmd}; COLD_CODE=$?; END_COLD=$(date +%s%N); "
-        'echo "MAAT_COLD_BUILD_NS=$((END_COLD-START_COLD))"; '
-        "if [ $COLD_CODE -ne 0 ]; then exit $COLD_CODE; fi; "
-        f"START_INCR=$(date +%s%N); {build_cmd}; INCR_CODE=$?; END_INCR=$(date +%s%N); "
-        'echo "MAAT_INCR_BUILD_NS=$((END_INCR-START_INCR))"; '
-        "exit $INCR_CODE"
+        f"START=$(date +%s%N); {cmd}; CODE=$?; END=$(date +%s%N); "
+        f'echo "{marker}=$((END-START))"; '
+        "exit $CODE"
         "'"
     )
 
 
+REV_FETCH_JOBS = HTTP_POOL_SIZE
+"""Number of project revisions resolved concurrently while planning."""
+
+
+def _fetch_revs(
+    projects: list[EcosystemProject],
+) -> tuple[list[str | None], list[SkippedProject]]:
+    """
+    Resolve revisions of all projects concurrently, in the order of projects.
+
+    Resolution is I/O-bound (``git ls-remote`` or registry requests), so it is done in threads.
+    A project whose revision cannot be resolved because of a network, registry or git failure
+    maps to ``None`` and is returned among skipped projects, so that it does not fail the whole
+    plan, but is still listed in the report. Any other error is a bug and fails planning.
+    """
+
+    def fetch(project: EcosystemProject) -> str | SkippedProject:
+        try:
+            return project.fetch_rev()
+        except (requests.RequestException, OSError, ValueError) as e:
+            # `ValueError` covers failed `git ls-remote` and malformed registry responses.
+            log(f"⚠️ Skipping {project.name}, failed to resolve its revision: {e}")
+            return SkippedProject(name=project.name, reason=str(e))
+
+    with ThreadPoolExecutor(max_workers=REV_FETCH_JOBS) as pool:
+        results = list(pool.map(fetch, projects))
+
+    revs = [r if isinstance(r, str) else None for r in results]
+    skipped = [r for r in results if isinstance(r, SkippedProject)]
+
+    if projects and len(skipped) == len(projects):
+        raise RuntimeError("failed to resolve revisions of all projects")
+
+    return revs, skipped
+
+
 def _parse_extra_env(extra_env: str | None) -> dict[str, str] | None:
     """Parse space-separated KEY=VALUE pairs into a dict.
 
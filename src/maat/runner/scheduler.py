@@ -0,0 +1,13 @@
+from maat.model import Test
+from maat.report.history import History
+
+
+def longest_first(tests: list[Test], history: History) -> list[Test]:
+    """
+    Order tests so that the ones predicted to take the longest are started first.
+
+    Tests are pulled by workers in submission order, so starting long tests early prevents a single
+    heavy project from stretching the partition's wall time while all other workers sit idle.
+    Ties keep the plan order.
+    """
+    return sorted(tests, key=history.predict_duration, reverse=True)
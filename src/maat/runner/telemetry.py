@@ -0,0 +1,112 @@
+import time
+from datetime import timedelta
+from pathlib import Path
+
+from maat.model import ResourceUsage
+
+CGROUP_ROOT = Path("/sys/fs/cgroup")
+
+SAMPLE_INTERVAL_SECS = 0.25
+"""Minimum time between two consecutive periodic samples of the same container."""
+
+
+class CgroupSampler:
+    """
+    Samples resource usage of a running container from its cgroup (v2) on this host.
+
+    Counters are cumulative, so the last sample taken while the container was alive is what ends
+    up in the summary. Callers take a ``final`` sample as soon as the container's process exits,
+    before the container is removed. If the cgroup is already gone by then, usage of at most the
+    last ``SAMPLE_INTERVAL_SECS`` is missing. Nothing is reported if the container's cgroup cannot
+    be found, e.g., when Docker runs in a VM or on cgroup v1.
+    """
+
+    def __init__(self, cidfile: Path | None = None):
+        self._cidfile = cidfile
+        self._cgroup: Path | None = None
+        self._usage: ResourceUsage | None = None
+        self._peak_memory_kb: int | None = None
+        self._last_sample = 0.0
+
+    def attach(self, container_id: str):
+        for candidate in (
+            # systemd cgroup driver
+            CGROUP_ROOT / "system.slice" / f"docker-{container_id}.scope",
+            # cgroupfs cgroup driver
+            CGROUP_ROOT / "docker" / container_id,
+        ):
+            if candidate.is_dir():
+                self._cgroup = candidate
+                return
+
+    def sample(self, final: bool = False):
+        now = time.monotonic()
+        if not final and now - self._last_sample < SAMPLE_INTERVAL_SECS:
+            return
+        self._last_sample = now
+
+        if self._cgroup is None:
+            if self._cidfile is None:
+                return
+            try:
+                container_id = self._cidfile.read_text().strip()
+            except OSError:
+                return
+            if not container_id:
+                return
+            self._cidfile = None
+            self.attach(container_id)
+            if self._cgroup is None:
+                return
+
+        try:
+            cpu = _read_flat_keyed(self._cgroup / "cpu.stat")
+            io = _read_io_stat(self._cgroup / "io.stat")
+            # `memory.peak` is only available since Linux 5.19.
+            memory_peak = _read_int(self._cgroup / "memory.peak")
+            if memory_peak is None:
+                memory_peak = _read_int(self._cgroup / "memory.current")
+        except (OSError, ValueError):
+            # The container has already exited and its cgroup is gone.
+            return
+
+        if memory_peak is not None:
+            self._peak_memory_kb = max(self._peak_memory_kb or 0, memory_peak // 1024)
+
+        self._usage = ResourceUsage(
+            cpu_user=timedelta(microseconds=cpu.get("user_usec", 0)),
+            cpu_system=timedelta(microseconds=cpu.get("system_usec", 0)),
+            cpu_throttled=timedelta(microseconds=cpu.get("throttled_usec", 0)),
+            peak_memory_kb=self._peak_memory_kb,
+            io_read_bytes=io.get("rbytes", 0),
+            io_write_bytes=io.get("wbytes", 0),
+        )
+
+    def summary(self) -> ResourceUsage | None:
+        return self._usage
+
+
+def _read_flat_keyed(path: Path) -> dict[str, int]:
+    result = {}
+    for line in path.read_text().splitlines():
+        key, _, value = line.partition(" ")
+        result[key] = int(value)
+    return result
+
+
+def _read_io_stat(path: Path) -> dict[str, int]:
+    """Sum per-device ``io.stat`` entries, e.g. ``8:0 rbytes=1 wbytes=2 rios=3 ...``."""
+    result: dict[str, int] = {}
+    for line in path.read_text().splitlines():
+        _device, *fields = line.split()
+        for field in fields:
+            key, _, value = field.partition("=")
+            result[key] = result.get(key, 0) + int(value)
+    return result
+
+
+def _read_int(path: Path) -> int | None:
+    try:
+        return int(path.read_text().strip())
+    except FileNotFoundError:
+        return None
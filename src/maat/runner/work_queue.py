@@ -0,0 +1,143 @@
+import sqlite3
+from collections.abc import Iterator
+from contextlib import closing, contextmanager
+from pathlib import Path
+
+from maat.model import Plan, Test
+from maat.report.history import History
+
+type WorkQueue = SqliteWorkQueue
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS tests (
+    plan TEXT NOT NULL,
+    name TEXT NOT NULL,
+    partition INTEGER NOT NULL,
+    cost REAL NOT NULL,
+    state TEXT NOT NULL DEFAULT 'pending',
+    runner INTEGER,
+    PRIMARY KEY (plan, name)
+)
+"""
+
+
+def open_work_queue(spec: str, plan: Plan, history: History) -> WorkQueue:
+    """
+    Open a work queue shared by runners of all partitions of the given plan.
+
+    Supported backends:
+
+    * ``sqlite:PATH`` - a SQLite database at ``PATH``, which must be reachable by all runners.
+    """
+    backend, sep, location = spec.partition(":")
+    if not sep or not location:
+        raise ValueError(f"invalid work queue, expected BACKEND:LOCATION: {spec}")
+
+    match backend:
+        case "sqlite":
+            return SqliteWorkQueue(Path(location), plan, history)
+        case unknown:
+            raise ValueError(f"unknown work queue backend: {unknown}")
+
+
+class SqliteWorkQueue:
+    """
+    Work queue of tests of a plan, stored in a SQLite database.
+
+    All tests of the plan are enqueued by whichever runner comes first. Runners claim tests
+    one by one: preferably from their own partition, and once it is exhausted, they steal from
+    other partitions. In both cases, the longest tests (as predicted from history) are claimed
+    first. Claims are made in ``IMMEDIATE`` transactions, so every test is run exactly once.
+
+    Tests are kept by ``Plan.id``, which is unique to every generated plan, so runners of one
+    plan share its tests however late they start, while a newly generated plan never sees tests
+    finished in an earlier run. Plans generated before IDs were introduced fall back to their
+    report name.
+    """
+
+    def __init__(self, path: Path, plan: Plan, history: History):
+        self._path = path
+        self._plan_key = plan.id or plan.report_name
+        self._tests = {
+            test.name: test for suite in plan.partitions for test in suite.tests
+        }
+
+        with self._transaction() as db:
+            db.execute(_SCHEMA)
+            db.executemany(
+                "INSERT OR IGNORE INTO tests (plan, name, partition, cost) "
+                "VALUES (?, ?, ?, ?)",
+                [
+                    (
+                        self._plan_key,
+                        test.name,
+                        partition,
+                        history.predict_duration(test).total_seconds(),
+                    )
+                    for partition, suite in enumerate(plan.partitions)
+                    for test in suite.tests
+                ],
+            )
+
+    def release_claimed(self, partition: int):
+        """Give back tests claimed by a previous runner of this partition which did not finish."""
+        with self._transaction() as db:
+            db.execute(
+                "UPDATE tests SET state = 'pending', runner = NULL "
+                "WHERE plan = ? AND state = 'running' AND runner = ?",
+                (self._plan_key, partition),
+            )
+
+    def mark_done(self, names: list[str]):
+        """Mark tests already finished by other means (e.g., a resumed run) as done."""
+        with self._transaction() as db:
+            db.executemany(
+                "UPDATE tests SET state = 'done' WHERE plan = ? AND name = ?",
+                [(self._plan_key, name) for name in names],
+            )
+
+    def claim(self, partition: int) -> Test | None:
+        """Claim the next test to run, or return ``None`` if there is nothing left to do."""
+        with self._transaction() as db:
+            row = db.execute(
+                "SELECT name FROM tests WHERE plan = ? AND state = 'pending' "
+                "ORDER BY partition != ?, cost DESC, name LIMIT 1",
+                (self._plan_key, partition),
+            ).fetchone()
+            if row is None:
+                return None
+
+            (name,) = row
+            db.execute(
+                "UPDATE tests SET state = 'running', runner = ? WHERE plan = ? AND name = ?",
+                (partition, self._plan_key, name),
+            )
+            return self._tests[name]
+
+    def complete(self, test: Test):
+        self._set_state(test, "done")
+
+    def release(self, test: Test):
+        """Put a claimed test back, so that any runner can claim it again."""
+        self._set_state(test, "pending")
+
+    def _set_state(self, test: Test, state: str):
+        with self._transaction() as db:
+            db.execute(
+                "UPDATE tests SET state = ?, runner = NULL WHERE plan = ? AND name = ?",
+                (state, self._plan_key, test.name),
+            )
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        with closing(
+            sqlite3.connect(self._path, timeout=60, isolation_level=None)
+        ) as db:
+            db.execute("BEGIN IMMEDIATE")
+            try:
+                yield db
+            except BaseException:
+                db.execute("ROLLBACK")
+                raise
+            else:
+                db.execute("COMMIT")
@@ -12,6 +12,7 @@ from maat.utils.slugify import slugify
 SANDBOX_REPOSITORY = "ghcr.io/software-mansion/maat/sandbox"
 MAAT_CACHE = "/mnt/maat-cache"
 MAAT_WORKBENCH = "/mnt/maat-workbench"
+MAAT_SHARED_CACHE = "/mnt/maat-shared-cache"
 
 
 def build(
@@ -46,6 +47,7 @@ def build(
                     "ASDF_STARKNET_FOUNDRY_VERSION": foundry,
                     "MAAT_CACHE": MAAT_CACHE,
                     "MAAT_WORKBENCH": MAAT_WORKBENCH,
+                    "MAAT_SHARED_CACHE": MAAT_SHARED_CACHE,
                 },
                 pull=True,
                 tags=[
@@ -0,0 +1,28 @@
+import os
+import threading
+from pathlib import Path
+
+
+def cache_root(env_var: str, name: str) -> Path:
+    """
+    Directory of an on-disk cache shared across runs on this machine.
+
+    It is ``$<env_var>`` if set, or ``$XDG_CACHE_HOME/maat/<name>`` by default.
+    """
+    if root := os.environ.get(env_var):
+        return Path(root)
+    cache_home = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+    return Path(cache_home) / "maat" / name
+
+
+def write_atomically(path: Path, text: str):
+    """
+    Write a cache entry, creating parent directories as needed.
+
+    The text is written to a temporary file first, unique per process and thread, and then
+    renamed over the entry, so that concurrent readers never see partial entries.
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    tmp.write_text(text, encoding="utf-8")
+    tmp.replace(path)
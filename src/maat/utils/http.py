@@ -0,0 +1,32 @@
+import functools
+
+import requests
+from requests.adapters import HTTPAdapter
+
+HTTP_POOL_SIZE = 16
+"""Maximum number of kept-alive connections per host, matching the planner's concurrency."""
+
+HTTP_TIMEOUT_SECS = 30
+"""Connect and read timeout of every request, like the one of ``git ls-remote`` in planning."""
+
+
+@functools.cache
+def session() -> requests.Session:
+    """
+    Process-wide HTTP session, so that connections to registries are reused across requests.
+
+    The session is shared by all threads. It is only used for plain GET requests, which do not
+    mutate its state apart from the connection pool, and that pool is thread-safe.
+    """
+    s = requests.Session()
+    adapter = HTTPAdapter(pool_connections=HTTP_POOL_SIZE, pool_maxsize=HTTP_POOL_SIZE)
+    s.mount("http://", adapter)
+    s.mount("https://", adapter)
+    return s
+
+
+def get(url: str, headers: dict[str, str] | None = None) -> requests.Response:
+    """GET the URL with the shared session, raising on HTTP errors."""
+    response = session().get(url, headers=headers, timeout=HTTP_TIMEOUT_SECS)
+    response.raise_for_status()
+    return response
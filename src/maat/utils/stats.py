@@ -0,0 +1,32 @@
+import math
+import statistics
+
+
+def mad(values: list[float], /) -> float:
+    """Median absolute deviation from the median, a robust measure of spread."""
+    median = statistics.median(values)
+    return statistics.median(abs(v - median) for v in values)
+
+
+def median_ci(values: list[float], /, confidence: float = 0.95) -> tuple[float, float]:
+    """
+    Distribution-free confidence interval of the median.
+
+    Uses order statistics: the interval between the j-th smallest and the j-th largest sample
+    covers the true median with probability ``1 - 2 * P(B < j)``, where ``B ~ Binomial(n, 1/2)``.
+    Picks the narrowest such interval with at least the requested coverage.
+    Too few samples cannot reach the requested coverage, and then the full range is returned.
+    """
+    xs = sorted(values)
+    n = len(xs)
+    alpha = 1 - confidence
+
+    j = 1
+    tail = 1 / 2**n  # P(B < 1)
+    while j < (n + 1) // 2:
+        tail += math.comb(n, j) / 2**n  # P(B < j + 1)
+        if 2 * tail > alpha:
+            break
+        j += 1
+
+    return xs[j - 1], xs[n - j]
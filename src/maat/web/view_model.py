@@ -5,8 +5,15 @@ from typing import Literal, Self
 from pydantic import BaseModel, ConfigDict, Field
 from pydantic.alias_generators import to_camel
 
-from maat.model import Label, LabelCategory, ReportMeta, StepReport, TestReport
-from maat.report.metrics import Metrics
+from maat.model import (
+    Label,
+    LabelCategory,
+    ReportMeta,
+    ResourceUsage,
+    StepReport,
+    TestReport,
+)
+from maat.report.metrics import BenchmarkStats, Metrics, StepResourceMetrics
 from maat.web.report_info import ReportInfo
 from maat.web.slices import Slice
 
@@ -31,10 +38,20 @@ class HardwareEnvironmentViewModel(BaseModel):
     ci: bool
 
 
+class StepResourceMetricsViewModel(StepResourceMetrics):
+    model_config = ViewModelConfig
+
+
+class BenchmarkStatsViewModel(BenchmarkStats):
+    model_config = ViewModelConfig
+
+
 class MetricsViewModel(Metrics):
     model_config = ViewModelConfig
 
     hardware: list[HardwareEnvironmentViewModel]
+    step_resources: dict[str, StepResourceMetricsViewModel]
+    benchmarks: dict[str, BenchmarkStatsViewModel]
 
     @classmethod
     def new(cls, metrics: Metrics) -> Self:
@@ -55,17 +72,24 @@ class LabelViewModel(BaseModel):
         )
 
 
+class ResourceUsageViewModel(ResourceUsage):
+    model_config = ViewModelConfig
+
+
 class StepViewModel(BaseModel):
     model_config = ViewModelConfig
 
     execution_time: timedelta | None
     exit_code: int | None
+    resources: ResourceUsageViewModel | None
 
     @classmethod
     def new(cls, step: StepReport) -> Self:
         return cls(
             execution_time=step.execution_time,
             exit_code=step.exit_code,
+            resources=step.resources
+            and ResourceUsageViewModel(**step.resources.model_dump()),
         )
 
 
@@ -90,6 +114,7 @@ class TestViewModel(BaseModel):
     incremental_build_no_test_time: timedelta | None
     ls_mem_post_analysis_kb: int | None
     ls_mem_post_analysis_peak_kb: int | None
+    benchmarks: dict[str, BenchmarkStatsViewModel]
 
     @classmethod
     def new(cls, test: TestReport, report_meta: ReportMeta) -> Self:
@@ -113,6 +138,12 @@ class TestViewModel(BaseModel):
             incremental_build_no_test_time=test.analyses.incremental_build_no_test_time,
             ls_mem_post_analysis_kb=test.analyses.ls_mem_post_analysis_kb,
             ls_mem_post_analysis_peak_kb=test.analyses.ls_mem_post_analysis_peak_kb,
+            benchmarks={
+                timing: BenchmarkStatsViewModel(
+                    **BenchmarkStats.compute(samples).model_dump()
+                )
+                for timing, samples in (test.analyses.benchmarks or {}).items()
+            },
         )
 
 
@@ -0,0 +1,262 @@
+import json
+import socketserver
+import struct
+import threading
+from collections.abc import Callable
+from queue import Queue
+
+import pytest
+from python_on_whales import DockerException
+
+from maat.runner.engine import API_VERSION, DockerEngine
+
+TIMEOUT_SECS = 5
+
+type Route = Callable[["_Handler", bytes], bytes | None]
+
+
+class FakeDaemon(socketserver.ThreadingUnixStreamServer):
+    """Minimal Docker daemon stand-in serving canned responses on a unix socket."""
+
+    daemon_threads = True
+
+    def __init__(self, socket_path: str, routes: dict[tuple[str, str], Route]):
+        super().__init__(socket_path, _Handler)
+        self.routes = routes
+        self.connections = 0
+        self.started = threading.Event()
+        self.attach_done = threading.Event()
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    server: FakeDaemon
+
+    def handle(self):
+        self.server.connections += 1
+        # Serve requests until the client closes the connection, like dockerd with keep-alive.
+        while request_line := self.rfile.readline():
+            method, target, _ = request_line.decode("latin-1").split(" ", 2)
+            headers = {}
+            while (line := self.rfile.readline()) not in (b"\r\n", b""):
+                key, _, value = line.decode("latin-1").partition(":")
+                headers[key.strip().lower()] = value.strip()
+            body = self.rfile.read(int(headers.get("content-length", 0)))
+
+            path = target.removeprefix(f"/{API_VERSION}").partition("?")[0]
+            response = self.server.routes[method, path](self, body)
+            if response is None:
+                return
+            self.wfile.write(response)
+            self.wfile.flush()
+
+
+def _no_content(handler: _Handler, body: bytes) -> bytes:
+    # dockerd (Go net/http) sends neither Content-Length nor Transfer-Encoding with 204.
+    return b"HTTP/1.1 204 No Content\r\n\r\n"
+
+
+def _json(status: str, payload) -> Route:
+    def route(handler: _Handler, body: bytes) -> bytes:
+        data = json.dumps(payload).encode()
+        return (
+            f"HTTP/1.1 {status}\r\nContent-Type: application/json\r\n"
+            f"Content-Length: {len(data)}\r\n\r\n"
+        ).encode() + data
+
+    return route
+
+
+def _chunked_json(payload) -> Route:
+    def route(handler: _Handler, body: bytes) -> bytes:
+        data = json.dumps(payload).encode()
+        head, tail = data[:5], data[5:]
+        return (
+            b"HTTP/1.1 200 OK\r\nContent-Type: application/json\r\n"
+            b"Transfer-Encoding: chunked\r\n\r\n"
+            + f"{len(head):x}\r\n".encode()
+            + head
+            + b"\r\n"
+            + f"{len(tail):x};ext=1\r\n".encode()
+            + tail
+            + b"\r\n0\r\n\r\n"
+        )
+
+    return route
+
+
+def _frame(stream_type: int, payload: bytes) -> bytes:
+    return struct.pack(">BxxxL", stream_type, len(payload)) + payload
+
+
+def _attach(frames: list[bytes]) -> Route:
+    def route(handler: _Handler, body: bytes) -> None:
+        handler.wfile.write(
+            b"HTTP/1.1 101 UPGRADED\r\n"
+            b"Content-Type: application/vnd.docker.raw-stream\r\n"
+            b"Connection: Upgrade\r\nUpgrade: tcp\r\n\r\n"
+        )
+        handler.wfile.flush()
+        assert handler.server.started.wait(TIMEOUT_SECS)
+        for frame in frames:
+            handler.wfile.write(frame)
+            handler.wfile.flush()
+        handler.server.attach_done.set()
+        # Returning None closes the hijacked connection, which ends the stream.
+
+    return route
+
+
+def _start(handler: _Handler, body: bytes) -> bytes:
+    handler.server.started.set()
+    return _no_content(handler, body)
+
+
+def _wait(exit_code: int) -> Route:
+    def route(handler: _Handler, body: bytes) -> bytes:
+        assert handler.server.attach_done.wait(TIMEOUT_SECS)
+        return _json("200 OK", {"StatusCode": exit_code})(handler, body)
+
+    return route
+
+
+@pytest.fixture
+def daemon(tmp_path):
+    servers = []
+
+    def serve(routes: dict[tuple[str, str], Route]) -> tuple[FakeDaemon, DockerEngine]:
+        server = FakeDaemon(str(tmp_path / "docker.sock"), routes)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        servers.append(server)
+        engine = DockerEngine(socket_path=server.server_address)
+        servers.append(engine)
+        return server, engine
+
+    yield serve
+
+    for server in reversed(servers):
+        if isinstance(server, DockerEngine):
+            server.close()
+        else:
+            server.shutdown()
+            server.server_close()
+
+
+def _call_with_timeout[T](fn: Callable[[], T]) -> T:
+    result: Queue = Queue()
+
+    def target():
+        try:
+            result.put((fn(), None))
+        except Exception as e:  # noqa: BLE001 - re-raised in the test thread
+            result.put((None, e))
+
+    thread = threading.Thread(target=target, daemon=True)
+    thread.start()
+    thread.join(TIMEOUT_SECS)
+    assert not thread.is_alive(), "request did not finish"
+    value, error = result.get_nowait()
+    if error is not None:
+        raise error
+    return value
+
+
+def test_no_content_responses_do_not_wait_for_eof(daemon):
+    server, engine = daemon(
+        {
+            ("POST", "/containers/c/start"): _no_content,
+            ("POST", "/containers/c/kill"): _no_content,
+            ("DELETE", "/containers/c"): _no_content,
+            ("DELETE", "/volumes/v"): _no_content,
+        }
+    )
+
+    _call_with_timeout(lambda: engine.start("c"))
+    _call_with_timeout(lambda: engine.kill("c"))
+    _call_with_timeout(lambda: engine.remove_container("c"))
+    _call_with_timeout(lambda: engine.remove_volume("v"))
+
+    # All requests went over a single keep-alive connection.
+    assert server.connections == 1
+
+
+def test_chunked_response(daemon):
+    _, engine = daemon(
+        {("GET", "/containers/c/json"): _chunked_json({"State": {"ExitCode": 3}})}
+    )
+
+    assert _call_with_timeout(lambda: engine.inspect("c")) == {"State": {"ExitCode": 3}}
+
+
+def test_content_length_response(daemon):
+    server, engine = daemon({("POST", "/commit"): _json("201 Created", {"Id": "img"})})
+
+    assert _call_with_timeout(lambda: engine.commit("c")) == "img"
+    assert _call_with_timeout(lambda: engine.commit("c")) == "img"
+    assert server.connections == 1
+
+
+def test_daemon_error(daemon):
+    _, engine = daemon(
+        {("GET", "/containers/c/json"): _json("404 Not Found", {"message": "no such"})}
+    )
+
+    with pytest.raises(DockerException) as e:
+        _call_with_timeout(lambda: engine.inspect("c"))
+    assert e.value.return_code == 125
+    assert e.value.stderr == "no such"
+
+
+def _run_events(engine: DockerEngine) -> list[tuple]:
+    def collect() -> list[tuple]:
+        events = engine.run("img", ["true"], name="c")
+        received = []
+        while True:
+            event = events.get(timeout=TIMEOUT_SECS)
+            received.append(event)
+            if event[0] in ("done", "docker_error", "error"):
+                return received
+
+    return _call_with_timeout(collect)
+
+
+def test_run_streams_attached_output(daemon):
+    _, engine = daemon(
+        {
+            ("POST", "/containers/create"): _json("201 Created", {"Id": "c"}),
+            ("POST", "/containers/c/attach"): _attach(
+                [
+                    _frame(1, b"hello\nwor"),
+                    _frame(2, b"oops\n"),
+                    _frame(1, b"ld\n"),
+                    _frame(2, b"no newline"),
+                ]
+            ),
+            ("POST", "/containers/c/wait"): _wait(0),
+            ("POST", "/containers/c/start"): _start,
+        }
+    )
+
+    assert _run_events(engine) == [
+        ("created", "c", None),
+        ("line", "stdout", b"hello\n"),
+        ("line", "stderr", b"oops\n"),
+        ("line", "stdout", b"world\n"),
+        ("line", "stderr", b"no newline"),
+        ("done", None, None),
+    ]
+
+
+def test_run_reports_exit_code(daemon):
+    _, engine = daemon(
+        {
+            ("POST", "/containers/create"): _json("201 Created", {"Id": "c"}),
+            ("POST", "/containers/c/attach"): _attach([_frame(1, b"failing\n")]),
+            ("POST", "/containers/c/wait"): _wait(2),
+            ("POST", "/containers/c/start"): _start,
+        }
+    )
+
+    *events, (kind, error, _) = _run_events(engine)
+    assert events == [("created", "c", None), ("line", "stdout", b"failing\n")]
+    assert kind == "docker_error"
+    assert error.return_code == 2
@@ -0,0 +1,16 @@
+from python_on_whales.utils import join_if_not_none
+
+from maat.hardware import WorkerIsolation
+from maat.runner.executor import _limits
+
+
+def test_limits_pass_cpus_to_docker_cli_as_list():
+    limits = _limits(WorkerIsolation(cpus=[10, 2], memory_mb=512))
+
+    assert limits == {"cpuset_cpus": [10, 2], "memory": "512m"}
+    # This is how python_on_whales builds the `--cpuset-cpus` argument.
+    assert join_if_not_none(limits["cpuset_cpus"]) == "10,2"
+
+
+def test_no_limits_without_isolation():
+    assert _limits(None) == {}
@@ -0,0 +1,98 @@
+import io
+import json
+from datetime import timedelta
+
+import pytest
+
+from maat.model import Report, StepReport
+from maat.model import TestReport as _TestReport
+from maat.report import log_sink
+from maat.report.io import save_report
+from maat.report.log_sink import LogSink, LogSpillRef
+
+LINES = [f"line {i}\n".encode() for i in range(100)]
+
+
+@pytest.fixture(autouse=True)
+def spill_dir(tmp_path, monkeypatch):
+    monkeypatch.setenv("MAAT_LOG_SPILL", str(tmp_path))
+    monkeypatch.setattr(log_sink, "LOG_HEAD_BYTES", 20)
+    monkeypatch.setattr(log_sink, "LOG_TAIL_BYTES", 30)
+    log_sink._spill_root.cache_clear()
+    yield tmp_path
+    log_sink._spill_root.cache_clear()
+
+
+def _step_report() -> StepReport:
+    sink = LogSink()
+    for line in LINES:
+        sink.write(line)
+    report = StepReport(
+        name="build", run="scarb build", exit_code=0, execution_time=None
+    )
+    report.log, report.log_spill = sink.finish()
+    return report
+
+
+def test_truncated_log_is_restored():
+    report = _step_report()
+
+    assert len(report.log) < 100
+    assert b"omitted" in report.log
+    assert report.full_log == b"".join(LINES)
+    assert report.log_str == b"".join(LINES).decode()
+
+
+def test_restored_log_is_kept_only_within_restored_logs(monkeypatch):
+    step = _step_report()
+    test = _TestReport(name="t", steps=[step])
+    calls = []
+    restore = LogSpillRef.restore
+
+    def counting_restore(self, log):
+        calls.append(log)
+        return restore(self, log)
+
+    monkeypatch.setattr(LogSpillRef, "restore", counting_restore)
+
+    with test.restored_logs():
+        for _ in range(3):
+            assert step.full_log == b"".join(LINES)
+            assert step.log_str is not None
+        assert len(calls) == 1
+
+    assert step._restored_log is None
+    assert step.full_log == b"".join(LINES)
+    assert len(calls) == 2
+
+
+def test_journaled_report_keeps_full_log():
+    test = _TestReport(name="t", steps=[_step_report()])
+
+    restored = _TestReport.model_validate_json(test.model_dump_json())
+
+    assert restored.steps[0].full_log == b"".join(LINES)
+
+
+def test_missing_spill_falls_back_to_truncated_log(spill_dir):
+    report = _step_report()
+    report.log_spill.path.unlink()
+
+    assert report.full_log == report.log
+
+
+def test_saved_report_omits_spill_reference():
+    report = Report(
+        workspace="w",
+        scarb="2.0.0",
+        foundry="0.1.0",
+        total_execution_time=timedelta(),
+        tests=[_TestReport(name="t", steps=[_step_report()])],
+    )
+
+    output = io.StringIO()
+    save_report(report, output)
+
+    assert "log_spill" not in json.loads(output.getvalue())["tests"][0]["steps"][0]
+    # The in-memory report still has it.
+    assert report.tests[0].steps[0].log_spill is not None
@@ -0,0 +1,56 @@
+import pytest
+import requests
+
+from maat.ecosystem.spec import EcosystemProject
+from maat.model import SkippedProject, Step
+from maat.runner.planner import _fetch_revs
+
+
+class _Project(EcosystemProject):
+    project_name: str
+    rev: str | None = None
+    error: type[Exception] | None = None
+
+    @property
+    def name(self) -> str:
+        return self.project_name
+
+    def fetch_rev(self) -> str:
+        if self.error is not None:
+            raise self.error("boom")
+        return self.rev
+
+    def setup(self) -> list[Step]:
+        return []
+
+
+def test_unresolvable_projects_are_skipped():
+    revs, skipped = _fetch_revs(
+        [
+            _Project(project_name="a", rev="1.0.0"),
+            _Project(project_name="b", error=requests.ConnectionError),
+            _Project(project_name="c", error=ValueError),
+            _Project(project_name="d", rev="abcdef012"),
+        ]
+    )
+
+    assert revs == ["1.0.0", None, None, "abcdef012"]
+    assert skipped == [
+        SkippedProject(name="b", reason="boom"),
+        SkippedProject(name="c", reason="boom"),
+    ]
+
+
+def test_unexpected_errors_fail_planning():
+    with pytest.raises(TypeError):
+        _fetch_revs(
+            [
+                _Project(project_name="a", rev="1.0.0"),
+                _Project(project_name="b", error=TypeError),
+            ]
+        )
+
+
+def test_planning_fails_when_no_project_resolves():
+    with pytest.raises(RuntimeError):
+        _fetch_revs([_Project(project_name="a", error=OSError)])
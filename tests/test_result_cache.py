@@ -0,0 +1,53 @@
+from datetime import timedelta
+
+from maat.model import HarnessOverhead, Plan, Report, ReportMeta
+from maat.model import Test as _Test
+from maat.model import TestReport as _TestReport
+from maat.model import TestSuite as _TestSuite
+from maat.report.metrics import Metrics
+from maat.report.result_cache import ResultCache
+
+TEST = _Test(name="t", rev="1", steps=[])
+
+
+def _plan() -> Plan:
+    return Plan(
+        workspace="w",
+        scarb="2.0.0",
+        foundry="0.1.0",
+        report_name="report",
+        sandbox="sha256:0",
+        partitions=[_TestSuite(tests=[TEST])],
+    )
+
+
+def test_results_are_reused_only_with_same_modes(tmp_path):
+    plain = ResultCache(_plan(), modes={"parallel_steps": False}, root=tmp_path)
+    parallel = ResultCache(_plan(), modes={"parallel_steps": True}, root=tmp_path)
+
+    parallel.store(TEST, _TestReport(name="t", steps=[]))
+
+    assert plain.load(TEST) is None
+    assert parallel.load(TEST) is not None
+
+
+def test_harness_overhead_skips_cached_tests():
+    def test_report(name: str, cached: bool) -> _TestReport:
+        return _TestReport(
+            name=name,
+            steps=[],
+            overhead=HarnessOverhead(bake=timedelta(seconds=10)),
+            cached=cached,
+        )
+
+    report = Report(
+        workspace="w",
+        scarb="2.0.0",
+        foundry="0.1.0",
+        total_execution_time=timedelta(),
+        tests=[test_report("executed", False), test_report("cached", True)],
+    )
+
+    metrics = Metrics.compute(report, ReportMeta(name="report"))
+
+    assert metrics.total_harness_overhead == timedelta(seconds=10)
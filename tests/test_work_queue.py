@@ -0,0 +1,43 @@
+from maat.model import Plan
+from maat.model import Test as _Test
+from maat.model import TestSuite as _TestSuite
+from maat.report.history import History
+from maat.runner.work_queue import SqliteWorkQueue
+
+
+def _plan(plan_id: str) -> Plan:
+    return Plan(
+        id=plan_id,
+        workspace="w",
+        scarb="2.0.0",
+        foundry="0.1.0",
+        report_name="report",
+        sandbox="sha256:0",
+        partitions=[
+            _TestSuite(tests=[_Test(name="a", rev="1", steps=[])]),
+            _TestSuite(tests=[_Test(name="b", rev="1", steps=[])]),
+        ],
+    )
+
+
+def _drain(queue: SqliteWorkQueue, partition: int) -> list[str]:
+    names = []
+    while (test := queue.claim(partition)) is not None:
+        queue.complete(test)
+        names.append(test.name)
+    return names
+
+
+def test_late_runner_does_not_rerun_finished_tests(tmp_path):
+    path = tmp_path / "queue.db"
+    plan = _plan("1")
+
+    assert _drain(SqliteWorkQueue(path, plan, History()), 0) == ["a", "b"]
+    assert _drain(SqliteWorkQueue(path, plan, History()), 1) == []
+
+
+def test_new_plan_starts_afresh(tmp_path):
+    path = tmp_path / "queue.db"
+
+    assert _drain(SqliteWorkQueue(path, _plan("1"), History()), 0) == ["a", "b"]
+    assert _drain(SqliteWorkQueue(path, _plan("2"), History()), 1) == ["b", "a"]